@@ -14,7 +14,10 @@ from utils.deadline_notifier import send_deadline_alerts
 from routes.auth import auth_bp
 from routes.data import data_bp
 from routes.mongo_tasks import mongo_tasks_bp
+from routes.mongo_notifications import mongo_notifications_bp
 from utils.mongo_db import init_mongo
+from utils.mongo_cli import register_mongo_commands
+from utils.json_provider import init_json
 
 # Flask extensions
 mail = Mail()
@@ -30,6 +33,9 @@ def create_app():
     # Enable CORS
     CORS(app, resources={r"/*": {"origins": "*"}})
 
+    # orjson-backed JSON with native ObjectId/datetime encoding
+    init_json(app)
+
     # JWT Config
     app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
     app.config['JWT_SECRET_KEY'] = 'jwt-secret-key-change-in-production'
@@ -40,17 +46,23 @@ def create_app():
     if db is None:
         raise RuntimeError("❌ MongoDB initialization failed.")
     print(f"✅ MongoDB connected: {db.name}")
+    register_mongo_commands(app)
 
     # -------------------------------
     # Email Configuration (using environment variables)
     # -------------------------------
     app.config.update(
-        MAIL_SERVER='smtp.gmail.com',
-        MAIL_PORT=587,
-        MAIL_USE_TLS=True,
+        MAIL_SERVER=os.getenv('MAIL_SERVER', 'smtp.gmail.com'),
+        MAIL_PORT=int(os.getenv('MAIL_PORT', '587')),
+        MAIL_USE_TLS=os.getenv('MAIL_USE_TLS', 'true').lower() == 'true',
         MAIL_USERNAME=os.getenv('MAIL_USERNAME'),       # e.g. taskgridd@gmail.com
         MAIL_PASSWORD=os.getenv('MAIL_PASSWORD'),       # your Google App Password
-        MAIL_DEFAULT_SENDER=('TaskGrid', os.getenv('MAIL_USERNAME'))
+        MAIL_DEFAULT_SENDER=('TaskGrid', os.getenv('MAIL_USERNAME')),
+        # Deadline email pool (utils/mail_delivery.py); MAIL_RATE_LIMIT is messages/second, 0 = unlimited
+        MAIL_DELIVERY_WORKERS=int(os.getenv('MAIL_DELIVERY_WORKERS', '4')),
+        MAIL_RATE_LIMIT=float(os.getenv('MAIL_RATE_LIMIT', '0')),
+        MAIL_MAX_RETRIES=int(os.getenv('MAIL_MAX_RETRIES', '3')),
+        MAIL_RETRY_BACKOFF=float(os.getenv('MAIL_RETRY_BACKOFF', '0.5'))
     )
 
     mail.init_app(app)
@@ -76,6 +88,7 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(data_bp, url_prefix="/data")
     app.register_blueprint(mongo_tasks_bp, url_prefix="/data")
+    app.register_blueprint(mongo_notifications_bp, url_prefix="/data")
 
     # -------------------------------
     # FRONTEND ROUTES
@@ -124,17 +137,6 @@ def create_app():
     def serve_notifications():
         return render_template('notification.html')
 
-    # ✅ API endpoint to fetch stored notifications
-    @app.route('/data/notifications', methods=['GET'])
-    def get_notifications():
-        """Return stored notifications from MongoDB"""
-        notifs = list(db.notifications.find().sort("timestamp", -1))
-        for n in notifs:
-            n["_id"] = str(n["_id"])
-            n["user_id"] = str(n.get("user_id", ""))
-            n["task_id"] = str(n.get("task_id", ""))
-        return jsonify({"notifications": notifs}), 200
-
     # ✅ 404 handler
     @app.errorhandler(404)
     def not_found(e):
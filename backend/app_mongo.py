@@ -6,7 +6,10 @@ import os
 from routes.mongo_auth import mongo_auth_bp
 from routes.mongo_tasks import mongo_tasks_bp
 from routes.mongo_data import mongo_data_bp
+from routes.mongo_notifications import mongo_notifications_bp
 from utils.mongo_db import init_mongo
+from utils.mongo_cli import register_mongo_commands
+from utils.json_provider import init_json
 
 
 def create_app():
@@ -17,6 +20,9 @@ def create_app():
     # ✅ Allow requests from same origin (your frontend)
     CORS(app, supports_credentials=True)
 
+    # ✅ orjson-backed JSON with native ObjectId/datetime encoding
+    init_json(app)
+
     app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
     app.config['JWT_SECRET_KEY'] = 'jwt-secret-string-change-in-production'
 
@@ -28,10 +34,14 @@ def create_app():
     else:
         print("✅ MongoDB initialized successfully.")
 
+    # `flask mongo-indexes` reports index drift against utils/mongo_indexes.py
+    register_mongo_commands(app)
+
     # ✅ Register API routes
     app.register_blueprint(mongo_auth_bp, url_prefix="/auth")
     app.register_blueprint(mongo_data_bp, url_prefix="/data")
     app.register_blueprint(mongo_tasks_bp, url_prefix="/data")
+    app.register_blueprint(mongo_notifications_bp, url_prefix="/data")
 
     # ---------- FRONTEND ROUTES ----------
 
@@ -1,6 +1,8 @@
 from .user_model import User
+from .data_version_model import DataVersion
 from .project_model import Project
+from .project_stats_model import ProjectStats
 from .task_model import Task
 from .work_log_model import WorkLog
 
-__all__ = ['User', 'Project', 'Task', 'WorkLog']
\ No newline at end of file
+__all__ = ['User', 'DataVersion', 'Project', 'ProjectStats', 'Task', 'WorkLog']
\ No newline at end of file
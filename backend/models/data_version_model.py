@@ -0,0 +1,11 @@
+from utils.db import db
+
+class DataVersion(db.Model):
+    """Write counter for one table, bumped in the same transaction as the write (see utils/versions.py)"""
+    __tablename__ = 'data_versions'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DataVersion {self.table_name}={self.version}>'
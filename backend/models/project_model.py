@@ -3,6 +3,13 @@ from utils.db import db
 
 class Project(db.Model):
     __tablename__ = 'projects'
+    __table_args__ = (
+        # Keyset pagination order
+        db.Index('ix_projects_created_at_id', 'created_at', 'id'),
+        db.Index('ix_projects_owner_id', 'owner_id'),
+        # ETag fingerprints and incremental exports
+        db.Index('ix_projects_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -19,9 +26,16 @@ class Project(db.Model):
     
     # Relationships
     tasks = db.relationship('Task', backref='project', lazy=True, cascade='all, delete-orphan')
+    stats = db.relationship('ProjectStats', uselist=False, lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        """Convert project object to dictionary"""
+    def to_dict(self, task_count=None):
+        """Convert project object to dictionary.
+
+        ``task_count`` lets batch serializers pass a precomputed count instead
+        of loading the whole ``tasks`` collection.
+        """
+        if task_count is None and self.stats:
+            task_count = self.stats.task_count
         return {
             'id': self.id,
             'name': self.name,
@@ -36,11 +50,14 @@ class Project(db.Model):
             'owner_name': f"{self.owner.first_name} {self.owner.last_name}" if self.owner else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'task_count': len(self.tasks) if self.tasks else 0
+            'task_count': task_count if task_count is not None else (len(self.tasks) if self.tasks else 0)
         }
     
     def get_progress(self):
         """Calculate project progress based on completed tasks"""
+        if self.stats:
+            return self.stats.get_progress()
+        
         if not self.tasks:
             return 0
         
@@ -49,6 +66,9 @@ class Project(db.Model):
     
     def get_total_hours(self):
         """Get total hours logged for this project"""
+        if self.stats:
+            return self.stats.total_hours
+        
         total_hours = 0
         for task in self.tasks:
             for work_log in task.work_logs:
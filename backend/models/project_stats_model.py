@@ -0,0 +1,38 @@
+from datetime import datetime
+from utils.db import db
+
+class ProjectStats(db.Model):
+    __tablename__ = 'project_stats'
+
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), primary_key=True)
+    task_count = db.Column(db.Integer, nullable=False, default=0)
+    todo_count = db.Column(db.Integer, nullable=False, default=0)
+    in_progress_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    cancelled_count = db.Column(db.Integer, nullable=False, default=0)
+    total_hours = db.Column(db.Float, nullable=False, default=0.0)
+    billable_cost = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def get_progress(self):
+        """Percentage of completed tasks"""
+        if not self.task_count:
+            return 0
+        return round((self.completed_count / self.task_count) * 100, 2)
+
+    def to_dict(self):
+        """Convert project stats to dictionary"""
+        return {
+            'project_id': self.project_id,
+            'task_count': self.task_count,
+            'todo_count': self.todo_count,
+            'in_progress_count': self.in_progress_count,
+            'completed_count': self.completed_count,
+            'cancelled_count': self.cancelled_count,
+            'total_hours': self.total_hours,
+            'billable_cost': self.billable_cost,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<ProjectStats {self.project_id}>'
@@ -3,6 +3,17 @@ from utils.db import db
 
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Keyset pagination order
+        db.Index('ix_tasks_created_at_id', 'created_at', 'id'),
+        # Filters used by the task list, dashboard and deadline checks
+        db.Index('ix_tasks_assigned_to_status', 'assigned_to', 'status'),
+        db.Index('ix_tasks_project_id_status', 'project_id', 'status'),
+        db.Index('ix_tasks_created_by', 'created_by'),
+        db.Index('ix_tasks_due_date', 'due_date'),
+        # ETag fingerprints and incremental exports
+        db.Index('ix_tasks_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -23,8 +34,12 @@ class Task(db.Model):
     work_logs = db.relationship('WorkLog', backref='task', lazy=True, cascade='all, delete-orphan')
     creator = db.relationship('User', foreign_keys=[created_by], backref='created_tasks')
     
-    def to_dict(self):
-        """Convert task object to dictionary"""
+    def to_dict(self, total_hours=None):
+        """Convert task object to dictionary.
+
+        ``total_hours`` lets batch serializers pass a precomputed sum instead
+        of loading every work log of the task.
+        """
         return {
             'id': self.id,
             'title': self.title,
@@ -43,7 +58,7 @@ class Task(db.Model):
             'creator_name': f"{self.creator.first_name} {self.creator.last_name}" if self.creator else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'total_hours_logged': self.get_total_hours_logged()
+            'total_hours_logged': total_hours if total_hours is not None else self.get_total_hours_logged()
         }
     
     def get_total_hours_logged(self):
@@ -4,6 +4,12 @@ from utils.db import db
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Keyset pagination order
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+        # ETag fingerprints
+        db.Index('ix_users_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -1,8 +1,31 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from utils.db import db
 
+def hours_between(work_date, start_time, end_time):
+    """Hours between two times on a work date; an earlier end time means the next day"""
+    if start_time and end_time:
+        start_datetime = datetime.combine(work_date, start_time)
+        end_datetime = datetime.combine(work_date, end_time)
+        
+        # Handle cases where end time is next day
+        if end_datetime < start_datetime:
+            end_datetime += timedelta(days=1)
+        
+        duration = end_datetime - start_datetime
+        return round(duration.total_seconds() / 3600, 2)
+    return 0
+
 class WorkLog(db.Model):
     __tablename__ = 'work_logs'
+    __table_args__ = (
+        # Keyset pagination order
+        db.Index('ix_work_logs_work_date_id', 'work_date', 'id'),
+        # Per-user timesheets and per-task hour totals
+        db.Index('ix_work_logs_user_id_work_date', 'user_id', 'work_date'),
+        db.Index('ix_work_logs_task_id', 'task_id'),
+        # ETag fingerprints and incremental exports
+        db.Index('ix_work_logs_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
@@ -41,17 +64,7 @@ class WorkLog(db.Model):
     
     def calculate_hours_from_time(self):
         """Calculate hours logged from start and end time"""
-        if self.start_time and self.end_time:
-            start_datetime = datetime.combine(self.work_date, self.start_time)
-            end_datetime = datetime.combine(self.work_date, self.end_time)
-            
-            # Handle cases where end time is next day
-            if end_datetime < start_datetime:
-                end_datetime = end_datetime.replace(day=end_datetime.day + 1)
-            
-            duration = end_datetime - start_datetime
-            return round(duration.total_seconds() / 3600, 2)
-        return 0
+        return hours_between(self.work_date, self.start_time, self.end_time)
     
     def __repr__(self):
         return f'<WorkLog {self.id} - {self.hours_logged}h on {self.work_date}>'
\ No newline at end of file
@@ -1,11 +1,19 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
 from models.user_model import User
 from utils.db import db
-from datetime import timedelta
+from utils.identity import identity_from_user, issue_tokens, register_identity_loader
 
 auth_bp = Blueprint('auth', __name__)
 
+def _load_identity(user_id):
+    """Identity for tokens issued before role claims were added"""
+    user = User.query.get(user_id)
+    return identity_from_user(user.id, user) if user else None
+
+# Token subjects are strings; SQL user ids are integers
+register_identity_loader(auth_bp, _load_identity, subject=int)
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
@@ -65,28 +73,40 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
-        # Create access token
-        access_token = create_access_token(
-            identity=user.id,
-            expires_delta=timedelta(days=1)
-        )
-        
+        # Create access and refresh tokens
         return jsonify({
             'message': 'Login successful',
-            'access_token': access_token,
+            **issue_tokens(str(user.id), user),
             'user': user.to_dict()
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Exchange a refresh token for a new access token with current role claims"""
+    try:
+        user = User.query.get(int(get_jwt_identity()))
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        if not user.is_active:
+            return jsonify({'error': 'Account is deactivated'}), 401
+        
+        return jsonify(issue_tokens(str(user.id), user, refresh=False)), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     """Get current user profile"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = User.query.get(int(get_jwt_identity()))
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -101,8 +121,7 @@ def get_profile():
 def update_profile():
     """Update current user profile"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = User.query.get(int(get_jwt_identity()))
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -137,8 +156,7 @@ def update_profile():
 def change_password():
     """Change user password"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = User.query.get(int(get_jwt_identity()))
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -1,16 +1,92 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
 from models.user_model import User
 from models.project_model import Project
+from models.project_stats_model import ProjectStats
 from models.task_model import Task
 from models.work_log_model import WorkLog
 from utils.db import db
+from utils.serializers import (
+    PROJECT_EXPANSIONS, TASK_EXPANSIONS, WORK_LOG_EXPANSIONS, parse_fieldset,
+    iter_projects, iter_tasks, iter_work_logs,
+    serialize_projects, serialize_tasks, serialize_work_logs
+)
+from utils.analytics import build_dashboard, build_time_summary
+from utils.helpers import get_list_arg, get_page_args, keyset_paginate, keyset_page, parse_datetime, safe_int
+from utils.export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, encode_rows
+from utils.rollups import record_change, task_contribution, work_log_contribution
+from utils.bulk import MAX_BULK_OPERATIONS, apply_task_operations
+from utils.worklog_import import WorkLogImport
+from utils.etag import etag_response, make_etag
+from utils.versions import data_versions
+from utils.cache import dashboard_cache, dashboard_cache_key
+from utils.identity import current_identity
+from utils.search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_query, search_terms
 from datetime import datetime, date
+import io
 from sqlalchemy import and_, or_, func
 
 
 data_bp = Blueprint('data', __name__)
 
+def _keyset_response(key, query, sort_column, id_column, serializer, page):
+    """Serialize one keyset page of a list endpoint.
+
+    Pages are only returned when the client sends ``cursor`` or ``limit``;
+    without them the endpoints keep returning the full list.
+    """
+    cursor, limit = page
+    try:
+        query = keyset_paginate(query, sort_column, id_column, cursor, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    items, next_cursor = keyset_page(serializer(query), limit, sort_column.key)
+    return jsonify({
+        key: items,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    }), 200
+
+def _list_etag(key, user, *depends_on):
+    """Strong ETag for a list: the caller, the request and the versions of the tables it reads"""
+    # The date covers values that move with the calendar (?include=schedule)
+    return make_etag(key, user.id, user.role, request.full_path, date.today(), data_versions(*depends_on))
+
+def _fieldset(model, expansions, sort_column, page):
+    """Sparse fieldset from ?fields=/?include=; id (and the sort key when paging) are always returned"""
+    always = ('id', sort_column.key) if page else ('id',)
+    return parse_fieldset(request.args, model, expansions, always)
+
+def _scope_projects(query, user):
+    """Admins and managers see all projects; others see owned projects or ones with a task assigned to them"""
+    if user.role in ['admin', 'manager']:
+        return query
+    return query.filter(
+        or_(
+            Project.owner_id == user.id,
+            Project.tasks.any(Task.assigned_to == user.id)
+        )
+    )
+
+def _scope_tasks(query, user):
+    """Team members see tasks assigned to or created by them, or in projects they own"""
+    if user.role in ['admin', 'manager']:
+        return query
+    return query.filter(
+        or_(
+            Task.assigned_to == user.id,
+            Task.created_by == user.id,
+            Task.project.has(Project.owner_id == user.id)
+        )
+    )
+
+def _scope_work_logs(query, user):
+    """Team members see only their own work logs"""
+    if user.role in ['admin', 'manager']:
+        return query
+    return query.filter(WorkLog.user_id == user.id)
+
 # ============ PROJECT ROUTES ============
 
 @data_bp.route('/projects', methods=['GET'])
@@ -18,27 +94,29 @@ data_bp = Blueprint('data', __name__)
 def get_projects():
     """Get all projects (filtered by user role)"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Admin and managers can see all projects, team members see only their assigned projects
-        if user.role in ['admin', 'manager']:
-            projects = Project.query.all()
-        else:
-            # Get projects where user is owner or has assigned tasks
-            projects = Project.query.filter(
-                or_(
-                    Project.owner_id == user_id,
-                    Project.tasks.any(Task.assigned_to == user_id)
-                )
-            ).all()
+        query = _scope_projects(Project.query, user)
         
-        return jsonify({
-            'projects': [project.to_dict() for project in projects]
-        }), 200
+        page = get_page_args(request.args)
+        try:
+            fieldset = _fieldset(Project, PROJECT_EXPANSIONS, Project.created_at, page)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        etag = _list_etag('projects', user, Project, Task, User)
+        
+        def build():
+            serializer = lambda q: serialize_projects(q, fieldset)
+            if page:
+                return _keyset_response('projects', query, Project.created_at, Project.id, serializer, page)
+            return jsonify({
+                'projects': serializer(query)
+            }), 200
+        
+        return etag_response(etag, build)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -48,8 +126,7 @@ def get_projects():
 def create_project():
     """Create a new project"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         if not user or user.role not in ['admin', 'manager']:
             return jsonify({'error': 'Insufficient permissions'}), 403
@@ -65,8 +142,9 @@ def create_project():
             status=data.get('status', 'active'),
             priority=data.get('priority', 'medium'),
             budget=data.get('budget', 0.0),
-            owner_id=user_id
+            owner_id=user.id
         )
+        project.stats = ProjectStats()
         
         # Parse dates if provided
         if data.get('start_date'):
@@ -93,25 +171,31 @@ def create_project():
 def get_project(project_id):
     """Get a specific project"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         project = Project.query.get(project_id)
         if not project:
             return jsonify({'error': 'Project not found'}), 404
         
         # Check permissions
-        if user.role not in ['admin', 'manager'] and project.owner_id != user_id:
+        if user.role not in ['admin', 'manager'] and project.owner_id != user.id:
             # Check if user has any tasks in this project
-            has_tasks = Task.query.filter_by(project_id=project_id, assigned_to=user_id).first()
+            has_tasks = Task.query.filter_by(project_id=project_id, assigned_to=user.id).first()
             if not has_tasks:
                 return jsonify({'error': 'Access denied'}), 403
         
-        project_data = project.to_dict()
-        project_data['progress'] = project.get_progress()
-        project_data['total_hours'] = project.get_total_hours()
+        # Without a rollup row progress and hours come from the task and work log tables
+        rollup = project.stats.updated_at if project.stats else data_versions(Task, WorkLog)
+        owner_update = project.owner.updated_at if project.owner else None
+        etag = make_etag('project', user.id, project.id, project.updated_at, owner_update, rollup)
         
-        return jsonify({'project': project_data}), 200
+        def build():
+            project_data = project.to_dict()
+            project_data['progress'] = project.get_progress()
+            project_data['total_hours'] = project.get_total_hours()
+            return jsonify({'project': project_data}), 200
+        
+        return etag_response(etag, build)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -121,15 +205,14 @@ def get_project(project_id):
 def update_project(project_id):
     """Update a project"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         project = Project.query.get(project_id)
         if not project:
             return jsonify({'error': 'Project not found'}), 404
         
         # Check permissions
-        if user.role not in ['admin', 'manager'] and project.owner_id != user_id:
+        if user.role not in ['admin', 'manager'] and project.owner_id != user.id:
             return jsonify({'error': 'Access denied'}), 403
         
         data = request.get_json()
@@ -172,8 +255,7 @@ def update_project(project_id):
 def get_tasks():
     """Get tasks (filtered by project access and user role)"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         project_id = request.args.get('project_id')
         status = request.args.get('status')
@@ -194,21 +276,24 @@ def get_tasks():
             query = query.filter_by(assigned_to=assigned_to)
         
         # Apply role-based filtering
-        if user.role not in ['admin', 'manager']:
-            # Team members see only their assigned tasks or tasks in projects they own
-            query = query.filter(
-                or_(
-                    Task.assigned_to == user_id,
-                    Task.created_by == user_id,
-                    Task.project.has(Project.owner_id == user_id)
-                )
-            )
+        query = _scope_tasks(query, user)
         
-        tasks = query.all()
+        page = get_page_args(request.args)
+        try:
+            fieldset = _fieldset(Task, TASK_EXPANSIONS, Task.created_at, page)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        etag = _list_etag('tasks', user, Task, Project, User, WorkLog)
         
-        return jsonify({
-            'tasks': [task.to_dict() for task in tasks]
-        }), 200
+        def build():
+            serializer = lambda q: serialize_tasks(q, fieldset)
+            if page:
+                return _keyset_response('tasks', query, Task.created_at, Task.id, serializer, page)
+            return jsonify({
+                'tasks': serializer(query)
+            }), 200
+        
+        return etag_response(etag, build)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -218,8 +303,7 @@ def get_tasks():
 def create_task():
     """Create a new task"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         data = request.get_json()
         
@@ -231,7 +315,7 @@ def create_task():
         if not project:
             return jsonify({'error': 'Project not found'}), 404
         
-        if user.role not in ['admin', 'manager'] and project.owner_id != user_id:
+        if user.role not in ['admin', 'manager'] and project.owner_id != user.id:
             return jsonify({'error': 'Access denied'}), 403
         
         task = Task(
@@ -242,7 +326,7 @@ def create_task():
             estimated_hours=data.get('estimated_hours', 0.0),
             project_id=data['project_id'],
             assigned_to=data.get('assigned_to'),
-            created_by=user_id
+            created_by=user.id
         )
         
         # Parse dates if provided
@@ -252,6 +336,7 @@ def create_task():
             task.due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
         
         db.session.add(task)
+        record_change(task.project_id, after=task_contribution(task.status))
         db.session.commit()
 
         # Schedule SMS reminder if phone is provided and due date exists
@@ -277,8 +362,7 @@ def create_task():
 def update_task(task_id):
     """Update a task"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         task = Task.query.get(task_id)
         if not task:
@@ -287,14 +371,15 @@ def update_task(task_id):
         # Check permissions
         can_edit = (
             user.role in ['admin', 'manager'] or
-            task.created_by == user_id or
-            task.assigned_to == user_id or
-            task.project.owner_id == user_id
+            task.created_by == user.id or
+            task.assigned_to == user.id or
+            task.project.owner_id == user.id
         )
         
         if not can_edit:
             return jsonify({'error': 'Access denied'}), 403
         
+        before = task_contribution(task.status)
         data = request.get_json()
         
         # Update fields
@@ -320,6 +405,7 @@ def update_task(task_id):
         if 'due_date' in data:
             task.due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date() if data['due_date'] else None
         
+        record_change(task.project_id, before, task_contribution(task.status))
         db.session.commit()
 
         # (Re)Schedule SMS if notify_phone provided in payload and we have a due_date
@@ -346,8 +432,7 @@ def patch_task(task_id):
     This enables dashboard progress updates without affecting other behavior.
     """
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
 
         task = Task.query.get(task_id)
         if not task:
@@ -356,13 +441,14 @@ def patch_task(task_id):
         # Permissions: same as update_task
         can_edit = (
             user.role in ['admin', 'manager'] or
-            task.created_by == user_id or
-            task.assigned_to == user_id or
-            task.project.owner_id == user_id
+            task.created_by == user.id or
+            task.assigned_to == user.id or
+            task.project.owner_id == user.id
         )
         if not can_edit:
             return jsonify({'error': 'Access denied'}), 403
 
+        before = task_contribution(task.status)
         data = request.get_json() or {}
 
         # Progress handling (0-100)
@@ -400,6 +486,7 @@ def patch_task(task_id):
         if 'due_date' in data:
             task.due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date() if data['due_date'] else None
 
+        record_change(task.project_id, before, task_contribution(task.status))
         db.session.commit()
         return jsonify({'message': 'Task patched successfully', 'task': task.to_dict()}), 200
 
@@ -407,6 +494,41 @@ def patch_task(task_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@data_bp.route('/tasks/bulk', methods=['POST'])
+@jwt_required()
+def bulk_tasks():
+    """Create, update and delete many tasks in one transaction.
+    Body: {"operations": [{"op": "create"|"update"|"delete", "id": ..., "data": {...}}]}
+    Returns one result per operation; invalid items are skipped, not fatal.
+    """
+    try:
+        user = current_identity()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+
+        data = request.get_json() or {}
+        operations = data.get('operations')
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'operations must be a non-empty list'}), 400
+        if len(operations) > MAX_BULK_OPERATIONS:
+            return jsonify({'error': f'At most {MAX_BULK_OPERATIONS} operations per request'}), 400
+
+        results = apply_task_operations(user, operations)
+        db.session.commit()
+
+        succeeded = [r for r in results if 'error' not in r]
+        return jsonify({
+            'results': results,
+            'created': sum(1 for r in succeeded if r['op'] == 'create'),
+            'updated': sum(1 for r in succeeded if r['op'] == 'update'),
+            'deleted': sum(1 for r in succeeded if r['op'] == 'delete'),
+            'failed': len(results) - len(succeeded)
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 # ============ WORK LOG ROUTES ============
 
 @data_bp.route('/work-logs', methods=['GET'])
@@ -414,8 +536,7 @@ def patch_task(task_id):
 def get_work_logs():
     """Get work logs"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         task_id = request.args.get('task_id')
         project_id = request.args.get('project_id')
@@ -444,15 +565,24 @@ def get_work_logs():
             query = query.filter(WorkLog.work_date <= datetime.strptime(end_date, '%Y-%m-%d').date())
         
         # Apply role-based filtering
-        if user.role not in ['admin', 'manager']:
-            # Team members see only their own work logs
-            query = query.filter_by(user_id=user_id)
+        query = _scope_work_logs(query, user)
+        
+        page = get_page_args(request.args)
+        try:
+            fieldset = _fieldset(WorkLog, WORK_LOG_EXPANSIONS, WorkLog.work_date, page)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        etag = _list_etag('work_logs', user, WorkLog, Task, Project, User)
         
-        work_logs = query.all()
+        def build():
+            serializer = lambda q: serialize_work_logs(q, fieldset)
+            if page:
+                return _keyset_response('work_logs', query, WorkLog.work_date, WorkLog.id, serializer, page)
+            return jsonify({
+                'work_logs': serializer(query)
+            }), 200
         
-        return jsonify({
-            'work_logs': [log.to_dict() for log in work_logs]
-        }), 200
+        return etag_response(etag, build)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -462,7 +592,7 @@ def get_work_logs():
 def create_work_log():
     """Create a new work log"""
     try:
-        user_id = get_jwt_identity()
+        user_id = current_identity().id
         data = request.get_json()
         
         if not data.get('task_id') or not data.get('hours_logged'):
@@ -500,6 +630,9 @@ def create_work_log():
                 work_log.hours_logged = work_log.calculate_hours_from_time()
         
         db.session.add(work_log)
+        record_change(task.project_id, after=work_log_contribution(
+            work_log.hours_logged, work_log.is_billable, work_log.hourly_rate
+        ))
         db.session.commit()
         
         return jsonify({
@@ -511,22 +644,49 @@ def create_work_log():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@data_bp.route('/work-logs/import', methods=['POST'])
+@jwt_required()
+def import_work_logs():
+    """Import work logs from a CSV upload (multipart "file" field or a text/csv body).
+    The upload is parsed as a stream and inserted in chunks; row-level errors are reported.
+    """
+    try:
+        user = current_identity()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+        try:
+            result = WorkLogImport(user).run(text_stream)
+        except (ValueError, UnicodeDecodeError) as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify(result.to_dict()), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @data_bp.route('/work-logs/<int:log_id>', methods=['PUT'])
 @jwt_required()
 def update_work_log(log_id):
     """Update a work log"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         work_log = WorkLog.query.get(log_id)
         if not work_log:
             return jsonify({'error': 'Work log not found'}), 404
         
         # Users can only edit their own work logs, unless they're admin/manager
-        if user.role not in ['admin', 'manager'] and work_log.user_id != user_id:
+        if user.role not in ['admin', 'manager'] and work_log.user_id != user.id:
             return jsonify({'error': 'Access denied'}), 403
         
+        before = work_log_contribution(work_log.hours_logged, work_log.is_billable, work_log.hourly_rate)
         data = request.get_json()
         
         # Update fields
@@ -547,6 +707,9 @@ def update_work_log(log_id):
         if 'end_time' in data:
             work_log.end_time = datetime.strptime(data['end_time'], '%H:%M:%S').time() if data['end_time'] else None
         
+        record_change(work_log.task.project_id, before, work_log_contribution(
+            work_log.hours_logged, work_log.is_billable, work_log.hourly_rate
+        ))
         db.session.commit()
         
         return jsonify({
@@ -565,61 +728,86 @@ def update_work_log(log_id):
 def get_dashboard():
     """Get dashboard data"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        
-        # Get user's projects and tasks based on role
-        if user.role in ['admin', 'manager']:
-            projects = Project.query.all()
-            tasks = Task.query.all()
-            work_logs = WorkLog.query.all()
+        user = current_identity()
+        
+        # The shared write counters are part of the key, so a write on any
+        # worker retires every worker's cached copy
+        versions = data_versions(Project, Task, WorkLog, User)
+        key = dashboard_cache_key(user.id, user.role, versions)
+        cached = dashboard_cache.get(key)
+        if cached:
+            etag, dashboard = cached
         else:
-            # Team member dashboard
-            projects = Project.query.filter(
-                or_(
-                    Project.owner_id == user_id,
-                    Project.tasks.any(Task.assigned_to == user_id)
-                )
-            ).all()
-            tasks = Task.query.filter_by(assigned_to=user_id).all()
-            work_logs = WorkLog.query.filter_by(user_id=user_id).all()
-        
-        # Calculate statistics
-        total_projects = len(projects)
-        active_projects = len([p for p in projects if p.status == 'active'])
-        
-        total_tasks = len(tasks)
-        completed_tasks = len([t for t in tasks if t.status == 'completed'])
-        overdue_tasks = len([t for t in tasks if t.is_overdue()])
-        
-        total_hours = sum(log.hours_logged for log in work_logs)
-        this_week_hours = sum(
-            log.hours_logged for log in work_logs 
-            if log.work_date and (date.today() - log.work_date).days <= 7
-        )
+            # Overdue and due-this-week counts move with the calendar, not just the data
+            etag = make_etag('dashboard', user.id, user.role, date.today(), versions)
+            dashboard = None
         
-        return jsonify({
-            'dashboard': {
-                'projects': {
-                    'total': total_projects,
-                    'active': active_projects,
-                    'completed': len([p for p in projects if p.status == 'completed'])
-                },
-                'tasks': {
-                    'total': total_tasks,
-                    'completed': completed_tasks,
-                    'in_progress': len([t for t in tasks if t.status == 'in_progress']),
-                    'overdue': overdue_tasks
-                },
-                'work_logs': {
-                    'total_hours': total_hours,
-                    'this_week_hours': this_week_hours,
-                    'total_entries': len(work_logs)
-                },
-                'recent_tasks': [task.to_dict() for task in tasks[-5:]],  # Last 5 tasks
-                'recent_work_logs': [log.to_dict() for log in work_logs[-5:]]  # Last 5 work logs
-            }
-        }), 200
+        def build():
+            payload = dashboard
+            if payload is None:
+                payload = build_dashboard(user)
+                dashboard_cache.set(key, (etag, payload))
+            return jsonify({'dashboard': payload}), 200
+        
+        return etag_response(etag, build)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@data_bp.route('/dashboard/cache', methods=['GET'])
+@jwt_required()
+def get_dashboard_cache_stats():
+    """Dashboard cache size and hit/miss counters for this worker (admin only)"""
+    try:
+        user = current_identity()
+        
+        if not user or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        return jsonify({'cache': dashboard_cache.stats()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ============ SEARCH ROUTES ============
+
+@data_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search():
+    """Full-text search over the tasks and projects the user can see"""
+    try:
+        user = current_identity()
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        q = request.args.get('q', '')
+        terms = search_terms(q)
+        if not terms:
+            return jsonify({'error': 'q is required'}), 400
+        
+        kinds = get_list_arg(request.args, 'type') or ['tasks', 'projects']
+        unknown = [kind for kind in kinds if kind not in ['tasks', 'projects']]
+        if unknown:
+            return jsonify({'error': f"Unknown type: {', '.join(unknown)}"}), 400
+        
+        limit = max(1, min(safe_int(request.args.get('limit'), DEFAULT_SEARCH_LIMIT), MAX_SEARCH_LIMIT))
+        results = {'query': q}
+        
+        if 'tasks' in kinds:
+            query = Task.query
+            if request.args.get('project_id'):
+                query = query.filter_by(project_id=request.args.get('project_id'))
+            if request.args.get('status'):
+                query = query.filter_by(status=request.args.get('status'))
+            query = _scope_tasks(query, user)
+            results['tasks'] = serialize_tasks(search_query(query, Task, 'tasks_fts', terms).limit(limit))
+        
+        if 'projects' in kinds:
+            query = _scope_projects(Project.query, user)
+            results['projects'] = serialize_projects(search_query(query, Project, 'projects_fts', terms).limit(limit))
+        
+        return jsonify(results), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -629,52 +817,68 @@ def get_dashboard():
 def get_time_summary():
     """Get time summary report"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         project_id = request.args.get('project_id')
         
-        query = WorkLog.query
+        summary = build_time_summary(
+            user,
+            start_date=datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+            end_date=datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None,
+            project_id=project_id
+        )
         
-        # Apply date filters
-        if start_date:
-            query = query.filter(WorkLog.work_date >= datetime.strptime(start_date, '%Y-%m-%d').date())
-        if end_date:
-            query = query.filter(WorkLog.work_date <= datetime.strptime(end_date, '%Y-%m-%d').date())
+        return jsonify({'time_summary': summary}), 200
         
-        # Apply project filter
-        if project_id:
-            query = query.join(Task).filter(Task.project_id == project_id)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ============ EXPORT ROUTES ============
+
+EXPORTS = {
+    'tasks': (Task, _scope_tasks, iter_tasks),
+    'work-logs': (WorkLog, _scope_work_logs, iter_work_logs),
+    'projects': (Project, _scope_projects, iter_projects)
+}
+
+@data_bp.route('/export/<kind>', methods=['GET'])
+@jwt_required()
+def export_data(kind):
+    """Stream tasks, work logs or projects as NDJSON (default) or CSV.
+    Optional ?updated_since=<ISO datetime> limits the export to recently changed rows.
+    """
+    try:
+        if kind not in EXPORTS:
+            return jsonify({'error': 'Unknown export'}), 404
         
-        # Apply role-based filtering
-        if user.role not in ['admin', 'manager']:
-            query = query.filter_by(user_id=user_id)
-        
-        work_logs = query.all()
-        
-        # Group by user and project
-        summary = {}
-        for log in work_logs:
-            user_key = f"{log.user.first_name} {log.user.last_name}"
-            project_key = log.task.project.name
-            
-            if user_key not in summary:
-                summary[user_key] = {}
-            if project_key not in summary[user_key]:
-                summary[user_key][project_key] = {
-                    'hours': 0,
-                    'billable_hours': 0,
-                    'cost': 0
-                }
-            
-            summary[user_key][project_key]['hours'] += log.hours_logged
-            if log.is_billable:
-                summary[user_key][project_key]['billable_hours'] += log.hours_logged
-                summary[user_key][project_key]['cost'] += log.hours_logged * log.hourly_rate
+        user = current_identity()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
         
-        return jsonify({'time_summary': summary}), 200
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'format must be ndjson or csv'}), 400
+        
+        model, scope, iter_rows = EXPORTS[kind]
+        query = scope(model.query, user)
+        
+        updated_since = request.args.get('updated_since')
+        if updated_since:
+            since = parse_datetime(updated_since)
+            if not since:
+                return jsonify({'error': 'updated_since must be an ISO datetime'}), 400
+            query = query.filter(model.updated_at >= since)
+        
+        rows = iter_rows(query.order_by(model.id), batch_size=EXPORT_BATCH_SIZE)
+        lines, mimetype = encode_rows(rows, export_format)
+        extension = 'csv' if export_format == 'csv' else 'ndjson'
+        return Response(
+            stream_with_context(lines),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={kind}.{extension}'}
+        )
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -686,12 +890,18 @@ def get_time_summary():
 def get_users():
     """Get all users (admin/manager only)"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         if user.role not in ['admin', 'manager']:
             return jsonify({'error': 'Access denied'}), 403
         
+        page = get_page_args(request.args)
+        if page:
+            return _keyset_response(
+                'users', User.query, User.created_at, User.id,
+                lambda query: [user.to_dict() for user in query.all()], page
+            )
+        
         users = User.query.all()
         return jsonify({
             'users': [user.to_dict() for user in users]
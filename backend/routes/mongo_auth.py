@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from datetime import timedelta, datetime
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
-from utils.mongo_db import users_col, to_str_id, oid
+from utils.mongo_db import users_col, oid, writer
+from utils.identity import identity_from_user, issue_tokens, register_identity_loader
 
 mongo_auth_bp = Blueprint('mongo_auth', __name__)
 
@@ -11,13 +14,23 @@ mongo_auth_bp = Blueprint('mongo_auth', __name__)
 
 def _user_public(doc):
     """Convert MongoDB document to public-safe user dict"""
-    d = to_str_id(doc)
-    if not d:
+    if not doc:
         return None
+    # Shallow copy; ObjectIds are encoded by the app's JSON provider
+    d = dict(doc)
     d.pop('password_hash', None)
     return d
 
 
+def _load_identity(uid):
+    """Identity for tokens issued before role claims were added"""
+    user = users_col.find_one({'_id': oid(uid)}, {'role': 1, 'username': 1, 'first_name': 1, 'last_name': 1})
+    return identity_from_user(uid, user) if user else None
+
+
+register_identity_loader(mongo_auth_bp, _load_identity)
+
+
 # ------------------ REGISTER ------------------ #
 @mongo_auth_bp.route('/register', methods=['POST'])
 def register():
@@ -45,16 +58,22 @@ def register():
             'last_name': data['last_name'],
             'role': data.get('role', 'team_member'),
             'is_active': True,
+            # Maintained by utils/notifications.py from the first notification on
+            'unread_count': 0,
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow(),
         }
 
-        res = users.insert_one(doc)
-        created = users.find_one({'_id': res.inserted_id})
+        try:
+            # insert_one() adds the generated _id to doc
+            writer(users, 'account').insert_one(doc)
+        except DuplicateKeyError:
+            # Lost a race with a concurrent signup; the unique indexes decide
+            return jsonify({'error': 'Username or email already exists'}), 400
 
         return jsonify({
             'message': 'User registered successfully',
-            'user': _user_public(created)
+            'user': _user_public(doc)
         }), 201
 
     except Exception as e:
@@ -81,14 +100,9 @@ def login():
         if not user.get('is_active', True):
             return jsonify({'error': 'Account is deactivated'}), 401
 
-        access_token = create_access_token(
-            identity=str(user['_id']),
-            expires_delta=timedelta(days=1)
-        )
-
         return jsonify({
             'message': 'Login successful',
-            'access_token': access_token,
+            **issue_tokens(str(user['_id']), user),
             'user': _user_public(user)
         }), 200
 
@@ -96,6 +110,26 @@ def login():
         return jsonify({'error': str(e)}), 500
 
 
+# ------------------ REFRESH ------------------ #
+@mongo_auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    try:
+        uid = get_jwt_identity()
+        user = users_col.find_one({'_id': oid(uid)})
+
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+
+        if not user.get('is_active', True):
+            return jsonify({'error': 'Account is deactivated'}), 401
+
+        return jsonify(issue_tokens(str(user['_id']), user, refresh=False)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # ------------------ PROFILE (GET) ------------------ #
 @mongo_auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
@@ -121,10 +155,6 @@ def update_profile():
     try:
         uid = get_jwt_identity()
         users = users_col
-        user = users.find_one({'_id': oid(uid)})
-
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
 
         data = request.get_json() or {}
         updates = {}
@@ -134,18 +164,29 @@ def update_profile():
         if 'last_name' in data:
             updates['last_name'] = data['last_name']
         if 'email' in data:
-            # Ensure uniqueness
-            existing = users.find_one({'email': data['email'], '_id': {'$ne': oid(uid)}})
-            if existing:
+            # Pre-check as register does: email_unique may be missing (legacy
+            # duplicates); when it exists it also catches concurrent updates
+            if users.count_documents({'email': data['email'], '_id': {'$ne': oid(uid)}}, limit=1):
                 return jsonify({'error': 'Email already exists'}), 400
             updates['email'] = data['email']
 
         if not updates:
+            if not users.count_documents({'_id': oid(uid)}, limit=1):
+                return jsonify({'error': 'User not found'}), 404
             return jsonify({'message': 'No changes'}), 200
 
         updates['updated_at'] = datetime.utcnow()
-        users.update_one({'_id': oid(uid)}, {'$set': updates})
-        user = users.find_one({'_id': oid(uid)})
+        try:
+            # Update and read back the new version in one round trip
+            user = writer(users, 'account').find_one_and_update(
+                {'_id': oid(uid)}, {'$set': updates},
+                projection={'password_hash': 0}, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            return jsonify({'error': 'Email already exists'}), 400
+
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
 
         return jsonify({
             'message': 'Profile updated successfully',
@@ -178,7 +219,7 @@ def change_password():
         if not check_password_hash(user.get('password_hash', ''), current_password):
             return jsonify({'error': 'Current password is incorrect'}), 400
 
-        users.update_one(
+        writer(users, 'account').update_one(
             {'_id': oid(uid)},
             {
                 '$set': {
@@ -1,16 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from bson.objectid import ObjectId
+from pymongo import ReturnDocument
 
 from utils.mongo_db import (
     users_col,
     projects_col,
     tasks_col,
     worklogs_col,
-    to_str_id,
     oid,
+    writer,
 )
+from utils.export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, encode_rows
+from utils.etag import etag_response, make_etag, mongo_fingerprint
+from routes.mongo_tasks import task_access_query
+from utils.identity import current_identity
+from utils.helpers import get_list_arg, safe_int
+from utils.search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
 
 mongo_data_bp = Blueprint('mongo_data', __name__)
 
@@ -26,6 +32,98 @@ def _parse_datetime(s):
         return None
 
 
+def _project_scope(uid, user):
+    """Filter for projects a user can see: all for admins/managers, else owned or assigned"""
+    # Admin or Manager → can view all projects
+    if user.is_manager:
+        return {}
+
+    # Normal user → own projects plus those of their tasks; distinct() runs on
+    # the server over the participants index. project_id may be an ObjectId or
+    # a string, so normalize via oid()
+    project_ids = {
+        oid(pid) for pid in tasks_col.distinct('project_id', task_access_query(uid, user.username))
+        if pid and oid(pid)
+    }
+    if not project_ids:
+        return {'owner_id': uid}
+    return {'$or': [{'owner_id': uid}, {'_id': {'$in': list(project_ids)}}]}
+
+
+def project_pipeline(match):
+    """Aggregation returning matched projects with task_count and owner_name.
+
+    Task counts and owners are joined on the server ($lookup on the indexed
+    tasks.project_id and users._id), so a list costs one round trip however
+    many projects it holds. Tasks may reference a project by ObjectId or by
+    its string form; both are counted. Needs MongoDB 5.0+ ($lookup with both
+    localField and pipeline).
+    """
+    return [
+        {'$match': match},
+        {'$addFields': {
+            '_project_keys': ['$_id', {'$toString': '$_id'}],
+            '_owner_oid': {'$convert': {'input': '$owner_id', 'to': 'objectId', 'onError': None, 'onNull': None}},
+        }},
+        {'$lookup': {
+            'from': tasks_col.name,
+            'localField': '_project_keys',
+            'foreignField': 'project_id',
+            'pipeline': [{'$group': {'_id': None, 'count': {'$sum': 1}}}],
+            'as': '_task_count',
+        }},
+        {'$lookup': {
+            'from': users_col.name,
+            'localField': '_owner_oid',
+            'foreignField': '_id',
+            'pipeline': [{'$project': {'first_name': 1, 'last_name': 1}}],
+            'as': '_owner',
+        }},
+        {'$addFields': {
+            'task_count': {'$ifNull': [{'$arrayElemAt': ['$_task_count.count', 0]}, 0]},
+            'owner_name': {'$let': {
+                'vars': {'owner': {'$arrayElemAt': ['$_owner', 0]}},
+                'in': {'$cond': [
+                    {'$ifNull': ['$$owner', False]},
+                    {'$trim': {'input': {'$concat': [
+                        {'$ifNull': ['$$owner.first_name', '']}, ' ',
+                        {'$ifNull': ['$$owner.last_name', '']},
+                    ]}}},
+                    None,
+                ]},
+            }},
+        }},
+        {'$project': {'_project_keys': 0, '_owner_oid': 0, '_task_count': 0, '_owner': 0}},
+    ]
+
+
+def _projects_fingerprint(scope):
+    """ETag inputs for a project list: the matched projects, their tasks and their owners.
+
+    task_count and owner_name read tasks and users too, but only the tasks
+    of the matched projects (project_id index) and the owners' _ids.
+    """
+    summary = next(projects_col.aggregate([
+        {'$match': scope},
+        {'$group': {
+            '_id': None,
+            'count': {'$sum': 1},
+            'last_update': {'$max': '$updated_at'},
+            'ids': {'$push': '$_id'},
+            'owners': {'$addToSet': '$owner_id'},
+        }},
+    ]), None)
+    if not summary:
+        return [0, None]
+    project_keys = summary['ids'] + [str(pid) for pid in summary['ids']]
+    owner_ids = list({oid(owner) for owner in summary['owners'] if oid(owner)})
+    return [
+        summary['count'], summary['last_update'],
+        mongo_fingerprint(tasks_col, {'project_id': {'$in': project_keys}}),
+        mongo_fingerprint(users_col, {'_id': {'$in': owner_ids}}),
+    ]
+
+
 # ---------- PROJECT ROUTES ----------
 
 @mongo_data_bp.route('/projects', methods=['GET'])
@@ -33,65 +131,18 @@ def _parse_datetime(s):
 def get_projects():
     try:
         uid = oid(get_jwt_identity())
-        user = users_col.find_one({'_id': uid})
+        user = current_identity()
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        # Admin or Manager → can view all projects
-        if user.get('role') in ['admin', 'manager']:
-            cursor = projects_col.find({})
-        else:
-            # Normal user → only see own or assigned projects
-            project_ids = set()
-            # tasks may store project_id as ObjectId or as string — normalize via oid()
-            for t in tasks_col.find({'$or': [{'created_by': uid}, {'assigned_to': uid}]}):
-                pid = t.get('project_id')
-                if not pid:
-                    continue
-                if isinstance(pid, ObjectId):
-                    project_ids.add(pid)
-                else:
-                    pid_oid = oid(pid)
-                    if pid_oid:
-                        project_ids.add(pid_oid)
-            # If project_ids empty this query will still allow owner matches
-            cursor = projects_col.find({
-                '$or': [
-                    {'owner_id': uid},
-                    {'_id': {'$in': list(project_ids)}} if project_ids else {'_id': {'$exists': False}}
-                ]
-            })
-
-        items = []
-        for p in cursor:
-            d = to_str_id(p)  # ✅ convert _id to string for JSON
-
-            # Convert any remaining ObjectId fields to string
-            if 'owner_id' in d and isinstance(d['owner_id'], ObjectId):
-                d['owner_id'] = str(d['owner_id'])
-
-            # Count tasks where project_id may be stored as ObjectId or string
-            d['task_count'] = tasks_col.count_documents({
-                '$or': [
-                    {'project_id': p['_id']},
-                    {'project_id': str(p['_id'])},
-                    {'project_id': {'$exists': False}}  # keeps behavior when none; optional
-                ]
-            })
-
-            # ✅ Fix: ensure correct ObjectId lookup for owner
-            owner = None
-            if p.get('owner_id'):
-                owner = users_col.find_one({'_id': oid(p.get('owner_id'))})
+        scope = _project_scope(uid, user)
+        etag = make_etag('projects', str(uid), user.role, *_projects_fingerprint(scope))
 
-            d['owner_name'] = (
-                f"{owner.get('first_name', '')} {owner.get('last_name', '')}".strip()
-                if owner else None
-            )
-
-            items.append(d)
+        def build():
+            items = list(projects_col.aggregate(project_pipeline(scope)))
+            return jsonify({'projects': items}), 200
 
-        return jsonify({'projects': items}), 200
+        return etag_response(etag, build)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -102,7 +153,7 @@ def get_projects():
 def create_project():
     try:
         uid = oid(get_jwt_identity())
-        user = users_col.find_one({'_id': uid})
+        user = current_identity()
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
@@ -129,23 +180,13 @@ def create_project():
             'updated_at': datetime.utcnow(),
         }
 
-        # Insert into MongoDB
-        res = projects_col.insert_one(doc)
-        created = projects_col.find_one({'_id': res.inserted_id})
-
-        # ✅ Convert ObjectIds to strings for JSON
-        d = to_str_id(created)
-        d['owner_id'] = str(d.get('owner_id')) if d.get('owner_id') else None
-        d['task_count'] = tasks_col.count_documents({
-            '$or': [
-                {'project_id': created['_id']},
-                {'project_id': str(created['_id'])}
-            ]
-        })
+        # Insert into MongoDB; insert_one() adds the generated _id to doc
+        writer(projects_col, 'board').insert_one(doc)
 
-        # Add readable owner name
-        owner = users_col.find_one({'_id': uid})
-        d['owner_name'] = f"{owner.get('first_name', '')} {owner.get('last_name', '')}".strip() if owner else None
+        d = doc
+        # A new project has no tasks yet, and its owner is the caller
+        d['task_count'] = 0
+        d['owner_name'] = user.name
 
         return jsonify({'message': 'Project created successfully', 'project': d}), 201
 
@@ -158,13 +199,10 @@ def create_project():
 def update_project(project_id):
     try:
         uid = oid(get_jwt_identity())
-        user = users_col.find_one({'_id': uid})
-        proj = projects_col.find_one({'_id': oid(project_id)})
-
-        if not proj:
+        user = current_identity()
+        project_oid = oid(project_id)
+        if not project_oid:
             return jsonify({'error': 'Project not found'}), 404
-        if user.get('role') not in ['admin', 'manager'] and proj.get('owner_id') != uid:
-            return jsonify({'error': 'Access denied'}), 403
 
         data = request.get_json() or {}
         updates = {}
@@ -179,25 +217,145 @@ def update_project(project_id):
             if date_field in data:
                 updates[date_field] = _parse_datetime(data[date_field]) if data[date_field] else None
 
+        # Ownership is part of the filter, so the update authorizes itself
+        query = {'_id': project_oid}
+        if not user.is_manager:
+            query['owner_id'] = uid
+
         if updates:
             updates['updated_at'] = datetime.utcnow()
-            projects_col.update_one({'_id': proj['_id']}, {'$set': updates})
+            proj = writer(projects_col, 'board').find_one_and_update(
+                query, {'$set': updates}, return_document=ReturnDocument.AFTER
+            )
+        else:
+            proj = projects_col.find_one(query)
 
-        # Fetch updated project
-        proj = projects_col.find_one({'_id': proj['_id']})
-        d = to_str_id(proj)
-        d['task_count'] = tasks_col.count_documents({'project_id': proj['_id']})
+        if not proj:
+            # Only failed requests pay for telling "missing" from "forbidden"
+            if projects_col.count_documents({'_id': project_oid}, limit=1):
+                return jsonify({'error': 'Access denied'}), 403
+            return jsonify({'error': 'Project not found'}), 404
 
-        owner = None
-        if proj.get('owner_id'):
-            owner = users_col.find_one({'_id': oid(proj.get('owner_id'))})
+        d = proj
+        d['task_count'] = tasks_col.count_documents({'project_id': {'$in': [proj['_id'], str(proj['_id'])]}})
 
-        d['owner_name'] = (
-            f"{owner.get('first_name', '')} {owner.get('last_name', '')}".strip()
-            if owner else None
-        )
+        if proj.get('owner_id') == uid:
+            # The caller owns it, so the display name comes from the token
+            d['owner_name'] = user.name
+        else:
+            owner = None
+            if proj.get('owner_id'):
+                owner = users_col.find_one({'_id': oid(proj.get('owner_id'))}, {'first_name': 1, 'last_name': 1})
+            d['owner_name'] = (
+                f"{owner.get('first_name', '')} {owner.get('last_name', '')}".strip()
+                if owner else None
+            )
 
         return jsonify({'message': 'Project updated successfully', 'project': d}), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+# ---------- SEARCH ROUTES ----------
+
+@mongo_data_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search():
+    """Full-text search over visible tasks and projects, ranked by text score.
+
+    Uses the tasks_text and projects_text indexes; $text matches whole
+    (stemmed) words, not prefixes.
+    """
+    try:
+        uid_str = get_jwt_identity()
+        uid = oid(uid_str)
+        user = current_identity()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+
+        q = (request.args.get('q') or '').strip()
+        if not q:
+            return jsonify({'error': 'q is required'}), 400
+
+        kinds = get_list_arg(request.args, 'type') or ['tasks', 'projects']
+        unknown = [kind for kind in kinds if kind not in ('tasks', 'projects')]
+        if unknown:
+            return jsonify({'error': f"Unknown type: {', '.join(unknown)}"}), 400
+
+        limit = max(1, min(safe_int(request.args.get('limit'), DEFAULT_SEARCH_LIMIT), MAX_SEARCH_LIMIT))
+        score = {'score': {'$meta': 'textScore'}}
+        results = {'query': q}
+
+        if 'tasks' in kinds:
+            # Same visibility as GET /data/tasks, managers included
+            query = {'$text': {'$search': q}, **task_access_query(uid_str, user.username)}
+            project_id = request.args.get('project_id')
+            if project_id:
+                query['project_id'] = {'$in': [oid(project_id), project_id]}
+            if request.args.get('status'):
+                query['status'] = request.args.get('status')
+            cursor = tasks_col.find(query, score).sort([('score', {'$meta': 'textScore'})]).limit(limit)
+            results['tasks'] = list(cursor)
+
+        if 'projects' in kinds:
+            query = {'$and': [{'$text': {'$search': q}}, _project_scope(uid, user)]}
+            cursor = projects_col.find(query, score).sort([('score', {'$meta': 'textScore'})]).limit(limit)
+            results['projects'] = list(cursor)
+
+        return jsonify(results), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ---------- EXPORT ROUTES ----------
+
+@mongo_data_bp.route('/export/<kind>', methods=['GET'])
+@jwt_required()
+def export_data(kind):
+    """Stream tasks, work logs or projects as NDJSON (default) or CSV."""
+    try:
+        if kind not in ('tasks', 'work-logs', 'projects'):
+            return jsonify({'error': 'Unknown export'}), 404
+
+        uid_str = get_jwt_identity()
+        uid = oid(uid_str)
+        user = current_identity()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'format must be ndjson or csv'}), 400
+
+        if kind == 'tasks':
+            collection = tasks_col
+            query = task_access_query(uid_str, user.username)
+        elif kind == 'work-logs':
+            collection = worklogs_col
+            query = {} if user.is_manager else {'user_id': {'$in': [uid, uid_str]}}
+        else:
+            collection = projects_col
+            query = _project_scope(uid, user)
+
+        updated_since = request.args.get('updated_since')
+        if updated_since:
+            try:
+                since = datetime.fromisoformat(updated_since)
+            except ValueError:
+                return jsonify({'error': 'updated_since must be an ISO datetime'}), 400
+            query = {'$and': [query, {'updated_at': {'$gte': since}}]}
+
+        # batch_size bounds how many documents the driver holds per round trip
+        cursor = collection.find(query).sort('_id', 1).batch_size(EXPORT_BATCH_SIZE)
+        lines, mimetype = encode_rows(cursor, export_format)
+        extension = 'csv' if export_format == 'csv' else 'ndjson'
+        return Response(
+            lines,
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={kind}.{extension}'}
+        )
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
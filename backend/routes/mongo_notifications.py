@@ -1,43 +1,71 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from utils.mongo_db import notifications_col, oid, to_str_id, projects_col, tasks_col
+from utils.helpers import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, safe_int
+from utils.notifications import UNREAD, READ, inbox_page, mark_read, unread_count
 
 mongo_notifications_bp = Blueprint('mongo_notifications', __name__)
 
 @mongo_notifications_bp.route('/notifications', methods=['GET'])
 @jwt_required()
 def get_notifications():
-    """Fetch all reminders/notifications for the logged-in user (includes project-level ones)."""
+    """One page of the logged-in user's notifications, newest first (?cursor=, ?limit=, ?status=)."""
     try:
         uid = get_jwt_identity()
-        # tolerant ObjectId conversion
+        status = request.args.get('status')
+        if status and status not in (UNREAD, READ):
+            return jsonify({"error": "status must be unread or read"}), 400
+        limit = max(1, min(safe_int(request.args.get('limit'), DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
         try:
-            uid_oid = ObjectId(uid)
-        except Exception:
-            uid_oid = uid
-
-        # projects owned by user
-        project_ids = []
-        for p in projects_col.find({"owner_id": uid_oid}):
-            project_ids.append(p["_id"])
-        # projects from tasks related to user
-        for t in tasks_col.find({"$or":[{"assigned_to": uid_oid}, {"created_by": uid_oid}]}):
-            pid = t.get("project_id")
-            try:
-                if isinstance(pid, ObjectId):
-                    project_ids.append(pid)
-                else:
-                    project_ids.append(ObjectId(pid))
-            except Exception:
-                project_ids.append(pid)
-
-        or_clauses = [{"user_id": oid(uid)}, {"user_id": str(uid)}]
-        if project_ids:
-            or_clauses.append({"project_id": {"$in": project_ids}})
-            or_clauses.append({"project_id": {"$in": [str(p) for p in project_ids]}})
-
-        cursor = notifications_col.find({"$or": or_clauses}).sort("timestamp", -1)
-        notifications = [to_str_id(n) for n in cursor]
-        return jsonify({"notifications": notifications}), 200
+            notifications, next_cursor = inbox_page(uid, request.args.get('cursor'), limit, status)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify({
+            "notifications": notifications,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            "unread_count": unread_count(uid)
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@mongo_notifications_bp.route('/notifications/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    """Badge polling: reads the counter kept on the user document."""
+    try:
+        return jsonify({"unread_count": unread_count(get_jwt_identity())}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@mongo_notifications_bp.route('/notifications/read', methods=['POST'])
+@jwt_required()
+def mark_notifications_read():
+    """Mark the notifications listed in {"ids": [...]} as read."""
+    try:
+        uid = get_jwt_identity()
+        ids = (request.get_json() or {}).get('ids')
+        if not isinstance(ids, list) or not ids:
+            return jsonify({"error": "ids must be a non-empty list"}), 400
+        if len(ids) > MAX_PAGE_SIZE:
+            return jsonify({"error": f"At most {MAX_PAGE_SIZE} ids per request"}), 400
+
+        updated = mark_read(uid, ids)
+        return jsonify({"updated": updated, "unread_count": unread_count(uid)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@mongo_notifications_bp.route('/notifications/read-all', methods=['POST'])
+@jwt_required()
+def mark_all_notifications_read():
+    """Mark every unread notification of the logged-in user as read."""
+    try:
+        uid = get_jwt_identity()
+        updated = mark_read(uid)
+        return jsonify({"updated": updated, "unread_count": unread_count(uid)}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
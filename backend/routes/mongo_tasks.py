@@ -1,14 +1,101 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from utils.mongo_db import tasks_col, users_col, to_str_id, oid
+from pymongo import ReturnDocument
+from utils.mongo_db import tasks_col, users_col, oid, writer
+from utils.etag import etag_response, make_etag, mongo_fingerprint
+from utils.identity import current_identity
+from utils.helpers import get_list_arg
+from utils.due_dates import parse_due_date
+from utils.participants import LEGACY_TASK_ACCESS, task_participants, user_ids_by_username
 
 mongo_tasks_bp = Blueprint('mongo_tasks', __name__)
 
 # ---------- Helper ----------
-def _task_public(doc):
-    """Convert MongoDB document to JSON-safe dict"""
-    return to_str_id(doc)
+# Documents are returned as stored: the app's JSON provider encodes
+# ObjectId and datetime values directly.
+
+def task_access_clauses(uid, username=None):
+    """$or clauses matching tasks the user owns, created or is assigned to.
+    Catches both ObjectId and string representations of the user id.
+    """
+    user_oid = oid(uid)
+    ors = [
+        {'user_id': {'$in': [user_oid, uid]}},
+        {'created_by': {'$in': [user_oid, uid]}},
+        {'assigned_to': {'$in': [user_oid, uid]}},
+        {'user_id_str': str(uid)},
+        {'created_by_str': str(uid)},
+        {'assigned_to_str': str(uid)},
+    ]
+    # Also match by assignee username if present
+    if username:
+        ors.append({'assignee': username})
+    return ors
+
+
+def task_access_query(uid, username=None):
+    """Filter for tasks the user participates in.
+
+    A single {participants: uid} predicate; while legacy access is enabled,
+    documents not yet backfilled are matched through task_access_clauses().
+    """
+    user_oid = oid(uid)
+    if user_oid is None:
+        return {'$or': task_access_clauses(uid, username)}
+    if not LEGACY_TASK_ACCESS:
+        return {'participants': user_oid}
+    return {'$or': [
+        {'participants': user_oid},
+        # participants: None is an index range too, empty once backfilled
+        {'participants': None, '$or': task_access_clauses(uid, username)},
+    ]}
+
+def task_write_query(uid):
+    """Filter for tasks the user may update or delete.
+
+    Only the id fields grant write access, as before participants existed;
+    an assignee named by username alone can read the task but not change it.
+    Writes select one task by _id, so this needs no index of its own.
+    """
+    return {'$or': task_access_clauses(uid)}
+
+# Denormalized fields each ?include= name adds to a sparse projection
+# Fields a task document may carry (create_task, update_task, the participants
+# backfill and legacy owner_id), the only names ?fields= accepts
+TASK_FIELDS = (
+    '_id', 'title', 'description', 'priority', 'status', 'progress',
+    'estimated_hours', 'start_date', 'due_date',
+    'project_id', 'project_id_str', 'assignee', 'assigned_to', 'assigned_to_str',
+    'user_id', 'user_id_str', 'created_by', 'created_by_str', 'owner_id',
+    'participants', 'created_at', 'updated_at',
+)
+
+TASK_INCLUDES = {
+    'project': ['project_id'],
+    'assignee': ['assignee', 'assigned_to'],
+    'creator': ['created_by'],
+}
+
+
+def task_projection(args):
+    """Mongo projection for ?fields=/?include=, or None for whole documents"""
+    fields = get_list_arg(args, 'fields')
+    include = get_list_arg(args, 'include')
+    for name in include or []:
+        if name not in TASK_INCLUDES:
+            raise ValueError(f"Unknown include '{name}'. Use: {', '.join(TASK_INCLUDES)}")
+    # Whole documents already carry every include
+    if fields is None:
+        return None
+    projection = {'_id': 1}
+    for name in fields:
+        if name not in TASK_FIELDS:
+            raise ValueError(f"Unknown field '{name}'")
+        projection[name] = 1
+    for name in include or []:
+        projection.update((field, 1) for field in TASK_INCLUDES[name])
+    return projection
 
 # ---------- DELETE TASK ----------
 @mongo_tasks_bp.route('/tasks/<task_id>', methods=['DELETE'])
@@ -21,18 +108,8 @@ def delete_task(task_id):
             return jsonify({'error': 'Invalid user identity'}), 401
 
         # Allow delete if current user is owner/creator/assignee
-        q = {
-            '_id': oid(task_id),
-            '$or': [
-                {'user_id': {'$in': [user_oid, uid]}},
-                {'created_by': {'$in': [user_oid, uid]}},
-                {'assigned_to': {'$in': [user_oid, uid]}},
-                {'user_id_str': str(uid)},
-                {'created_by_str': str(uid)},
-                {'assigned_to_str': str(uid)},
-            ]
-        }
-        res = tasks_col.delete_one(q)
+        q = {'_id': oid(task_id), **task_write_query(uid)}
+        res = writer(tasks_col, 'board').delete_one(q)
         if res.deleted_count == 0:
             return jsonify({'error': 'Task not found or not permitted'}), 404
         return jsonify({'message': 'Task deleted'}), 200
@@ -46,7 +123,7 @@ def delete_task(task_id):
 def create_task():
     try:
         uid = get_jwt_identity()
-        user = users_col.find_one({'_id': oid(uid)})
+        user = current_identity()
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
@@ -56,6 +133,11 @@ def create_task():
             if not data.get(f):
                 return jsonify({'error': f'{f} is required'}), 400
 
+        # Stored as a BSON datetime so deadline scans can use the status_due_date index
+        due_date = parse_due_date(data['due_date'])
+        if due_date is None:
+            return jsonify({'error': 'due_date must be YYYY-MM-DD or an ISO 8601 datetime'}), 400
+
         # Normalize project_id and assigned_to to ObjectId when possible
         project_raw = data.get('project_id')
         project_oid = oid(project_raw) if project_raw else None
@@ -73,9 +155,9 @@ def create_task():
             'project_id_str': str(project_raw) if project_raw is not None else None,
             'estimated_hours': float(data.get('estimated_hours', 0) or 0),
             'start_date': data['start_date'],
-            'due_date': data['due_date'],
+            'due_date': due_date,
             'status': data.get('status', 'todo'),
-            'assignee': data.get('assignee') or user.get('username', 'Unknown'),
+            'assignee': data.get('assignee') or user.username or 'Unknown',
             'assigned_to': assigned_oid if assigned_oid else (assigned_raw if assigned_raw else None),
             'assigned_to_str': str(assigned_raw) if assigned_raw is not None else None,
             # store both ObjectId and string for user
@@ -86,14 +168,18 @@ def create_task():
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
+        # An assignee given only by username is resolved once here, not on every read
+        by_username = {user.username: oid(uid)}
+        if not assigned_oid and doc['assignee'] not in by_username:
+            by_username = user_ids_by_username(users_col, [doc['assignee']])
+        doc['participants'] = task_participants(doc, by_username)
 
-        res = tasks_col.insert_one(doc)
-        created = tasks_col.find_one({'_id': res.inserted_id})
-        task_data = to_str_id(created)
+        # insert_one() adds the generated _id to doc, so it is returned as stored
+        writer(tasks_col, 'board').insert_one(doc)
 
         return jsonify({
             'message': 'Task created successfully',
-            'task': task_data
+            'task': doc
         }), 201
 
     except Exception as e:
@@ -106,34 +192,32 @@ def create_task():
 def get_tasks():
     try:
         uid = get_jwt_identity()
-        user_oid = oid(uid)
 
-        # Resolve username for matching
-        username = None
-        if user_oid:
-            user_doc = users_col.find_one({'_id': user_oid})
-            if user_doc:
-                username = user_doc.get('username')
-
-        # Build flexible $or query to catch both ObjectId and string representations
-        ors = [
-            {'user_id': {'$in': [user_oid, uid]}},
-            {'created_by': {'$in': [user_oid, uid]}},
-            {'assigned_to': {'$in': [user_oid, uid]}},
-            {'user_id_str': str(uid)},
-            {'created_by_str': str(uid)},
-            {'assigned_to_str': str(uid)},
-        ]
-
-        # Also match by assignee username if present
-        if username:
-            ors.append({'assignee': username})
-
-        # Query and sort by creation time (newest first)
-        cursor = tasks_col.find({'$or': ors}).sort('created_at', -1)
-        tasks = [to_str_id(t) for t in cursor]
-
-        return jsonify({'tasks': tasks}), 200
+        # Username for matching legacy assignee fields comes from the token
+        user = current_identity()
+        username = user.username if user else None
+
+        # One multikey participants lookup (plus legacy clauses during the transition)
+        query = task_access_query(uid, username)
+
+        try:
+            projection = task_projection(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Task documents are self-contained, so the matched tasks alone decide the ETag
+        etag = make_etag(
+            'tasks', str(uid), username, projection,
+            mongo_fingerprint(tasks_col, query)
+        )
+
+        def build():
+            # Query and sort by creation time (newest first)
+            cursor = tasks_col.find(query, projection).sort('created_at', -1)
+            tasks = list(cursor)
+            return jsonify({'tasks': tasks}), 200
+
+        return etag_response(etag, build)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -144,7 +228,6 @@ def get_tasks():
 def update_task(task_id):
     try:
         uid = get_jwt_identity()
-        user_oid = oid(uid)
         data = request.get_json() or {}
 
         update_fields = {}
@@ -155,26 +238,25 @@ def update_task(task_id):
         if not update_fields:
             return jsonify({'error': 'No valid fields to update'}), 400
 
+        if update_fields.get('due_date'):
+            update_fields['due_date'] = parse_due_date(update_fields['due_date'])
+            if update_fields['due_date'] is None:
+                return jsonify({'error': 'due_date must be YYYY-MM-DD or an ISO 8601 datetime'}), 400
+        elif 'due_date' in update_fields:
+            update_fields['due_date'] = None
+
         update_fields['updated_at'] = datetime.utcnow()
         # Broaden authorization like delete: allow owner/creator/assignee and legacy *_str fields
-        auth_q = {
-            '_id': oid(task_id),
-            '$or': [
-                {'user_id': {'$in': [user_oid, uid]}},
-                {'created_by': {'$in': [user_oid, uid]}},
-                {'assigned_to': {'$in': [user_oid, uid]}},
-                {'user_id_str': str(uid)},
-                {'created_by_str': str(uid)},
-                {'assigned_to_str': str(uid)},
-            ]
-        }
-        res = tasks_col.update_one(auth_q, {'$set': update_fields})
+        auth_q = {'_id': oid(task_id), **task_write_query(uid)}
+        # Update and read back the new version in one round trip
+        updated = writer(tasks_col, 'board').find_one_and_update(
+            auth_q, {'$set': update_fields}, return_document=ReturnDocument.AFTER
+        )
 
-        if res.modified_count == 0 and res.matched_count == 0:
+        if not updated:
             return jsonify({'error': 'Task not found or not permitted'}), 404
 
-        updated = tasks_col.find_one({'_id': oid(task_id)})
-        return jsonify({'message': 'Task updated', 'task': to_str_id(updated)}), 200
+        return jsonify({'message': 'Task updated', 'task': updated}), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
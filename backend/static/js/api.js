@@ -11,6 +11,7 @@
 
   const tokenKey = `${CONFIG.STORAGE_PREFIX}token`;
   const userKey = `${CONFIG.STORAGE_PREFIX}user`;
+  const refreshKey = `${CONFIG.STORAGE_PREFIX}refresh_token`;
 
   function getToken() {
     return localStorage.getItem(tokenKey);
@@ -20,6 +21,20 @@
     else localStorage.removeItem(tokenKey);
   }
 
+  // Access tokens are short-lived; trade the refresh token for a new one
+  async function refreshToken() {
+    const refresh = localStorage.getItem(refreshKey);
+    if (!refresh) return false;
+    const res = await fetch(`${CONFIG.API_BASE_URL}/auth/refresh`, {
+      method: 'POST',
+      headers: { 'Authorization': `Bearer ${refresh}` }
+    });
+    if (!res.ok) return false;
+    const body = await res.json();
+    setToken(body.access_token);
+    return true;
+  }
+
   function buildQs(params) {
     if (!params) return '';
     const s = new URLSearchParams();
@@ -43,15 +58,19 @@
       data = arg1.data || null;
     }
 
-    const headers = { 'Content-Type': 'application/json' };
-    const token = getToken();
-    if (token) headers['Authorization'] = `Bearer ${token}`;
+    const send = () => {
+      const headers = { 'Content-Type': 'application/json' };
+      const token = getToken();
+      if (token) headers['Authorization'] = `Bearer ${token}`;
+      return fetch(`${CONFIG.API_BASE_URL}${endpoint}`, {
+        method,
+        headers,
+        body: data ? JSON.stringify(data) : null
+      });
+    };
 
-    const res = await fetch(`${CONFIG.API_BASE_URL}${endpoint}`, {
-      method,
-      headers,
-      body: data ? JSON.stringify(data) : null
-    });
+    let res = await send();
+    if (res.status === 401 && await refreshToken()) res = await send();
 
     let payload = null;
     try { payload = await res.json(); } catch (_) { payload = null; }
@@ -59,6 +78,7 @@
     if (res.status === 401) {
       // Clear auth and force login
       localStorage.removeItem(tokenKey);
+      localStorage.removeItem(refreshKey);
       localStorage.removeItem(userKey);
       // redirect — adjust path if your login is in a subfolder
       window.location.href = '/login.html';
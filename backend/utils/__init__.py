@@ -7,7 +7,8 @@ from .validators import (
 from .helpers import (
     admin_required, manager_or_admin_required, format_date, format_datetime,
     parse_date, parse_datetime, get_week_start_end, get_month_start_end,
-    calculate_business_days, format_duration, paginate_query, safe_float, safe_int
+    calculate_business_days, format_duration, paginate_query, safe_float, safe_int,
+    encode_cursor, decode_cursor, get_page_args, get_list_arg, keyset_paginate, keyset_page
 )
 
 __all__ = [
@@ -17,5 +18,6 @@ __all__ = [
     'validate_task_status', 'validate_priority', 'validate_required_fields',
     'admin_required', 'manager_or_admin_required', 'format_date', 'format_datetime',
     'parse_date', 'parse_datetime', 'get_week_start_end', 'get_month_start_end',
-    'calculate_business_days', 'format_duration', 'paginate_query', 'safe_float', 'safe_int'
+    'calculate_business_days', 'format_duration', 'paginate_query', 'safe_float', 'safe_int',
+    'encode_cursor', 'decode_cursor', 'get_page_args', 'get_list_arg', 'keyset_paginate', 'keyset_page'
 ]
\ No newline at end of file
@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+
+from sqlalchemy import case, func, or_
+
+from models.project_model import Project
+from models.task_model import Task
+from models.user_model import User
+from models.work_log_model import WorkLog
+from utils.db import db
+from utils.serializers import serialize_tasks, serialize_work_logs
+
+# SQL-side aggregates for the dashboard and reports. Everything here is
+# computed with GROUP BY / CASE queries so memory use does not grow with
+# the size of the tables.
+
+RECENT_LIMIT = 5
+
+
+def _count_if(condition):
+    """SUM(CASE WHEN condition THEN 1 ELSE 0 END), 0 on empty input"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _sum_if(condition, column):
+    """SUM(CASE WHEN condition THEN column ELSE 0 END), 0 on empty input"""
+    return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+
+def overdue_condition(today):
+    """SQL equivalent of Task.is_overdue()"""
+    return (Task.due_date < today) & (Task.status != 'completed')
+
+
+def dashboard_scopes(user):
+    """Return the project, task and work log queries visible on a user's dashboard"""
+    if user.role in ['admin', 'manager']:
+        return Project.query, Task.query, WorkLog.query
+
+    projects = Project.query.filter(
+        or_(
+            Project.owner_id == user.id,
+            Project.tasks.any(Task.assigned_to == user.id)
+        )
+    )
+    tasks = Task.query.filter_by(assigned_to=user.id)
+    work_logs = WorkLog.query.filter_by(user_id=user.id)
+    return projects, tasks, work_logs
+
+
+def _latest(query, id_column, serializer):
+    """Serialize the last RECENT_LIMIT rows of a query in insertion order"""
+    rows = serializer(query.order_by(id_column.desc()).limit(RECENT_LIMIT))
+    rows.reverse()
+    return rows
+
+
+def build_dashboard(user, today=None):
+    """Compute the dashboard payload for a user"""
+    today = today or date.today()
+    projects, tasks, work_logs = dashboard_scopes(user)
+
+    project_stats = projects.with_entities(
+        func.count(Project.id),
+        _count_if(Project.status == 'active'),
+        _count_if(Project.status == 'completed')
+    ).one()
+
+    task_stats = tasks.with_entities(
+        func.count(Task.id),
+        _count_if(Task.status == 'completed'),
+        _count_if(Task.status == 'in_progress'),
+        _count_if(overdue_condition(today))
+    ).one()
+
+    log_stats = work_logs.with_entities(
+        func.coalesce(func.sum(WorkLog.hours_logged), 0),
+        _sum_if(WorkLog.work_date >= today - timedelta(days=7), WorkLog.hours_logged),
+        func.count(WorkLog.id)
+    ).one()
+
+    return {
+        'projects': {
+            'total': project_stats[0],
+            'active': project_stats[1],
+            'completed': project_stats[2]
+        },
+        'tasks': {
+            'total': task_stats[0],
+            'completed': task_stats[1],
+            'in_progress': task_stats[2],
+            'overdue': task_stats[3]
+        },
+        'work_logs': {
+            'total_hours': log_stats[0],
+            'this_week_hours': log_stats[1],
+            'total_entries': log_stats[2]
+        },
+        'recent_tasks': _latest(tasks, Task.id, serialize_tasks),
+        'recent_work_logs': _latest(work_logs, WorkLog.id, serialize_work_logs)
+    }
+
+
+def build_time_summary(user, start_date=None, end_date=None, project_id=None):
+    """Hours, billable hours and cost per user and project in one grouped query"""
+    billable = WorkLog.is_billable.is_(True)
+    query = db.session.query(
+        User.first_name,
+        User.last_name,
+        Project.name,
+        func.sum(WorkLog.hours_logged),
+        _sum_if(billable, WorkLog.hours_logged),
+        _sum_if(billable, WorkLog.hours_logged * func.coalesce(WorkLog.hourly_rate, 0))
+    ).select_from(WorkLog).join(
+        User, WorkLog.user_id == User.id
+    ).join(
+        Task, WorkLog.task_id == Task.id
+    ).join(
+        Project, Task.project_id == Project.id
+    )
+
+    if start_date:
+        query = query.filter(WorkLog.work_date >= start_date)
+    if end_date:
+        query = query.filter(WorkLog.work_date <= end_date)
+    if project_id:
+        query = query.filter(Task.project_id == project_id)
+
+    # Team members only see their own time
+    if user.role not in ['admin', 'manager']:
+        query = query.filter(WorkLog.user_id == user.id)
+
+    summary = {}
+    rows = query.group_by(User.id, Project.id).all()
+    for first_name, last_name, project_name, hours, billable_hours, cost in rows:
+        # Display names are not unique, so merge groups that share one
+        entry = summary.setdefault(f"{first_name} {last_name}", {}).setdefault(
+            project_name, {'hours': 0, 'billable_hours': 0, 'cost': 0}
+        )
+        entry['hours'] += hours
+        entry['billable_hours'] += billable_hours
+        entry['cost'] += cost
+    return summary
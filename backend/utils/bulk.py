@@ -0,0 +1,212 @@
+from datetime import date, datetime
+
+from sqlalchemy import case, delete, func
+from sqlalchemy.orm import joinedload
+
+from models.project_model import Project
+from models.task_model import Task
+from models.work_log_model import WorkLog
+from utils.db import db
+from utils.helpers import safe_int
+from utils.rollups import record_change, task_contribution
+from utils.versions import touch_tables
+
+# Batched task writes for POST /data/tasks/bulk.
+#
+# Permissions are checked against projects and tasks prefetched with one
+# IN query each; valid operations are then written with executemany-style
+# bulk statements in a single transaction. Invalid operations are reported
+# per item and do not stop the rest of the batch.
+
+MAX_BULK_OPERATIONS = 1000
+
+TASK_FIELDS = ['title', 'description', 'status', 'priority', 'estimated_hours', 'assigned_to']
+DATE_FIELDS = ['start_date', 'due_date']
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def _task_values(data):
+    """Column values from a create/patch payload; raises ValueError on bad dates"""
+    values = {field: data[field] for field in TASK_FIELDS if field in data}
+    for field in DATE_FIELDS:
+        if field in data:
+            values[field] = _parse_date(data[field])
+    return values
+
+
+def _is_manager(user):
+    return user.role in ['admin', 'manager']
+
+
+def _can_edit(user, task):
+    """Same rule as PUT /tasks/<id>"""
+    return (
+        _is_manager(user) or
+        task.created_by == user.id or
+        task.assigned_to == user.id or
+        task.project.owner_id == user.id
+    )
+
+
+def _can_delete(user, task):
+    """Managers, the task creator and the project owner may delete a task"""
+    return _is_manager(user) or task.created_by == user.id or task.project.owner_id == user.id
+
+
+def _add_delta(deltas, project_id, contribution, sign=1):
+    project_deltas = deltas.setdefault(project_id, {})
+    for column, value in contribution.items():
+        project_deltas[column] = project_deltas.get(column, 0) + sign * value
+
+
+def apply_task_operations(user, operations):
+    """Validate and apply a batch of task operations; returns per-item results.
+
+    Each operation is ``{'op': 'create', 'data': {...}}``,
+    ``{'op': 'update', 'id': 1, 'data': {...}}`` or ``{'op': 'delete', 'id': 1}``.
+    The caller commits.
+    """
+    results = [None] * len(operations)
+    task_ids = set()
+    project_ids = set()
+    for op in operations:
+        if not isinstance(op, dict):
+            continue
+        if op.get('op') in ('update', 'delete') and safe_int(op.get('id'), None) is not None:
+            task_ids.add(safe_int(op['id']))
+        if op.get('op') == 'create' and isinstance(op.get('data'), dict):
+            project_ids.add(safe_int(op['data'].get('project_id'), None))
+
+    tasks = {}
+    if task_ids:
+        tasks = {
+            task.id: task
+            for task in Task.query.options(joinedload(Task.project)).filter(Task.id.in_(task_ids))
+        }
+    projects = {}
+    if project_ids:
+        projects = {project.id: project for project in Project.query.filter(Project.id.in_(project_ids))}
+
+    creates, updates, deletes = [], [], []
+    seen = set()
+    for index, op in enumerate(operations):
+        kind = op.get('op') if isinstance(op, dict) else None
+
+        def fail(error, status=400):
+            results[index] = {'index': index, 'op': kind, 'status': status, 'error': error}
+
+        if kind not in ('create', 'update', 'delete'):
+            fail('op must be create, update or delete')
+            continue
+
+        if kind == 'create':
+            data = op.get('data') or {}
+            if not data.get('title') or not data.get('project_id'):
+                fail('Title and project_id are required')
+                continue
+            project = projects.get(safe_int(data['project_id'], None))
+            if not project:
+                fail('Project not found', 404)
+                continue
+            if not _is_manager(user) and project.owner_id != user.id:
+                fail('Access denied', 403)
+                continue
+            try:
+                values = _task_values(data)
+            except ValueError as e:
+                fail(str(e))
+                continue
+            values.setdefault('status', 'todo')
+            values.setdefault('priority', 'medium')
+            values.setdefault('description', '')
+            values.setdefault('estimated_hours', 0.0)
+            values.update(project_id=project.id, created_by=user.id)
+            creates.append((index, values))
+            continue
+
+        task = tasks.get(safe_int(op.get('id'), None))
+        if not task:
+            fail('Task not found', 404)
+            continue
+        if task.id in seen:
+            fail('Task appears more than once in the batch')
+            continue
+        seen.add(task.id)
+
+        if kind == 'update':
+            if not _can_edit(user, task):
+                fail('Access denied', 403)
+                continue
+            try:
+                values = _task_values(op.get('data') or {})
+            except ValueError as e:
+                fail(str(e))
+                continue
+            if values.get('status') == 'completed' and not task.completion_date:
+                values['completion_date'] = date.today()
+            updates.append((index, task, values))
+        else:
+            if not _can_delete(user, task):
+                fail('Access denied', 403)
+                continue
+            deletes.append((index, task))
+
+    deltas = {}
+    now = datetime.utcnow()
+
+    if creates:
+        mappings = [dict(values, created_at=now, updated_at=now) for _, values in creates]
+        db.session.bulk_insert_mappings(Task, mappings, return_defaults=True)
+        for (index, values), mapping in zip(creates, mappings):
+            _add_delta(deltas, values['project_id'], task_contribution(values['status']))
+            results[index] = {'index': index, 'op': 'create', 'status': 201, 'id': mapping['id']}
+
+    if updates:
+        mappings = []
+        for index, task, values in updates:
+            new_status = values.get('status', task.status)
+            if new_status != task.status:
+                _add_delta(deltas, task.project_id, task_contribution(task.status), -1)
+                _add_delta(deltas, task.project_id, task_contribution(new_status))
+            mappings.append(dict(values, id=task.id, updated_at=now))
+            results[index] = {'index': index, 'op': 'update', 'status': 200, 'id': task.id}
+        db.session.bulk_update_mappings(Task, mappings)
+
+    if deletes:
+        delete_ids = [task.id for _, task in deletes]
+        billable = WorkLog.is_billable.is_(True)
+        logged = dict(
+            (task_id, (hours, cost))
+            for task_id, hours, cost in db.session.query(
+                WorkLog.task_id,
+                func.sum(WorkLog.hours_logged),
+                func.sum(case(
+                    (billable, WorkLog.hours_logged * func.coalesce(WorkLog.hourly_rate, 0)), else_=0
+                ))
+            ).filter(WorkLog.task_id.in_(delete_ids)).group_by(WorkLog.task_id)
+        )
+        for index, task in deletes:
+            hours, cost = logged.get(task.id, (0, 0))
+            _add_delta(deltas, task.project_id, task_contribution(task.status), -1)
+            _add_delta(deltas, task.project_id, {'total_hours': hours or 0, 'billable_cost': cost or 0}, -1)
+            results[index] = {'index': index, 'op': 'delete', 'status': 200, 'id': task.id}
+        db.session.execute(
+            delete(WorkLog).where(WorkLog.task_id.in_(delete_ids)).execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            delete(Task).where(Task.id.in_(delete_ids)).execution_options(synchronize_session=False)
+        )
+        for _, task in deletes:
+            db.session.expunge(task)
+
+    if creates or updates:
+        # bulk_*_mappings() skip the flush events utils/versions.py listens to
+        touch_tables(db.session, Task)
+
+    for project_id, project_deltas in deltas.items():
+        record_change(project_id, after=project_deltas)
+
+    return results
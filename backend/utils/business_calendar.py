@@ -0,0 +1,117 @@
+import os
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+# Business-day arithmetic.
+#
+# A BusinessCalendar is a weekmask (which weekdays are worked) plus a list of
+# holidays, so each workspace can have its own. Single ranges are counted in
+# O(1) from whole weeks and a per-weekday remainder table, minus a bisect over
+# the holidays; whole task sets go through NumPy's busday functions in one
+# vectorized call. Ranges are half-open, [start, end), like
+# numpy.busday_count.
+
+DEFAULT_WEEKMASK = '1111100'
+
+
+def _parse_weekmask(weekmask):
+    """Accept '1111100', 'Mon Tue Wed Thu Fri' or a sequence of 7 booleans"""
+    if isinstance(weekmask, str):
+        if len(weekmask) == 7 and set(weekmask) <= {'0', '1'}:
+            return tuple(flag == '1' for flag in weekmask)
+        names = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+        chosen = {name[:3].lower() for name in weekmask.split()}
+        if not chosen <= set(names):
+            raise ValueError(f"Invalid weekmask '{weekmask}'")
+        return tuple(name in chosen for name in names)
+    mask = tuple(bool(flag) for flag in weekmask)
+    if len(mask) != 7:
+        raise ValueError('weekmask must have 7 entries, Monday first')
+    return mask
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return value
+
+
+def as_day_array(values):
+    """Convert dates, datetimes, ISO strings or None (-> NaT) to datetime64[D]"""
+    return np.array([_as_date(value) for value in values], dtype='datetime64[D]')
+
+
+class BusinessCalendar:
+    """Working days of a workspace: a weekmask and a set of holidays"""
+
+    def __init__(self, weekmask=DEFAULT_WEEKMASK, holidays=()):
+        self.weekmask = _parse_weekmask(weekmask)
+        if not any(self.weekmask):
+            raise ValueError('weekmask must include at least one working day')
+        # Holidays that fall on non-working days do not change any count
+        days = {_as_date(day) for day in holidays if day}
+        self.holidays = sorted(day for day in days if self.weekmask[day.weekday()])
+        self._holiday_ordinals = [day.toordinal() for day in self.holidays]
+        self.days_per_week = sum(self.weekmask)
+        # _partial[w][k]: working days among the k days starting on weekday w
+        self._partial = [
+            [sum(self.weekmask[(w + i) % 7] for i in range(k)) for k in range(7)]
+            for w in range(7)
+        ]
+        self._busdaycal = np.busdaycalendar(
+            weekmask=[int(flag) for flag in self.weekmask],
+            holidays=np.array(self.holidays, dtype='datetime64[D]')
+        )
+
+    def is_business_day(self, day):
+        day = _as_date(day)
+        if not self.weekmask[day.weekday()]:
+            return False
+        ordinal = day.toordinal()
+        index = bisect_left(self._holiday_ordinals, ordinal)
+        return index == len(self._holiday_ordinals) or self._holiday_ordinals[index] != ordinal
+
+    def count(self, start, end):
+        """Business days in [start, end); when end is before start, minus those in (end, start]"""
+        if start is None or end is None:
+            return 0
+        start, end = _as_date(start), _as_date(end)
+        if end < start:
+            # Same convention as numpy.busday_count
+            one_day = timedelta(days=1)
+            return -self.count(end + one_day, start + one_day)
+        first, last = start.toordinal(), end.toordinal()
+        weeks, rest = divmod(last - first, 7)
+        days = weeks * self.days_per_week + self._partial[start.weekday()][rest]
+        holidays = bisect_left(self._holiday_ordinals, last) - bisect_left(self._holiday_ordinals, first)
+        return days - holidays
+
+    def count_inclusive(self, start, end):
+        """Business days from start through end, 0 when end is before start"""
+        if start is None or end is None:
+            return 0
+        return max(0, self.count(start, _as_date(end) + timedelta(days=1)))
+
+    def count_many(self, starts, ends):
+        """Vectorized count() over paired sequences; missing dates count as 0"""
+        starts, ends = as_day_array(starts), as_day_array(ends)
+        counts = np.zeros(starts.shape, dtype=np.int64)
+        valid = ~(np.isnat(starts) | np.isnat(ends))
+        counts[valid] = np.busday_count(starts[valid], ends[valid], busdaycal=self._busdaycal)
+        return counts
+
+    def __repr__(self):
+        mask = ''.join('1' if flag else '0' for flag in self.weekmask)
+        return f'<BusinessCalendar {mask} holidays={len(self.holidays)}>'
+
+
+@lru_cache(maxsize=1)
+def default_calendar():
+    """Calendar from BUSINESS_WEEKMASK and BUSINESS_HOLIDAYS (comma-separated YYYY-MM-DD)"""
+    holidays = [day.strip() for day in os.getenv('BUSINESS_HOLIDAYS', '').split(',') if day.strip()]
+    return BusinessCalendar(os.getenv('BUSINESS_WEEKMASK', DEFAULT_WEEKMASK), holidays)
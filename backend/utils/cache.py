@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+# In-process response caching.
+#
+# Each worker keeps its own cache. Keys embed the shared write counters of
+# utils/versions.py, so a write committed by any worker makes every
+# worker's old entries unreachable; they age out through the TTL and LRU.
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate=None):
+        """Drop entries whose key matches ``predicate`` (all entries by default)"""
+        with self._lock:
+            if predicate is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+dashboard_cache = TTLCache(
+    maxsize=int(os.getenv('DASHBOARD_CACHE_SIZE', '1024')),
+    ttl=int(os.getenv('DASHBOARD_CACHE_TTL', '30'))
+)
+
+
+def dashboard_cache_key(user_id, role, versions):
+    """Dashboards are cached per user, role, day (overdue counts follow the calendar) and data version"""
+    return (str(user_id), role, date.today(), tuple(versions))
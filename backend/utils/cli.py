@@ -0,0 +1,70 @@
+import click
+from flask.cli import with_appcontext
+
+from utils.db import db
+
+# Maintenance commands for the SQL backend, e.g. ``flask rebuild-project-stats``.
+
+
+@click.command('rebuild-project-stats')
+@click.option('--project-id', type=int, default=None, help='Only rebuild this project.')
+@with_appcontext
+def rebuild_project_stats_command(project_id):
+    """Recompute project rollups from tasks and work logs"""
+    from utils.rollups import rebuild_project_stats
+
+    count = rebuild_project_stats(project_id)
+    db.session.commit()
+    click.echo(f"Rebuilt stats for {count} project(s)")
+
+
+@click.command('db-upgrade')
+@click.option('--to', 'target', type=int, default=None, help='Stop after this version.')
+@with_appcontext
+def db_upgrade_command(target):
+    """Apply pending schema migrations"""
+    from utils.migrations import upgrade
+
+    count = upgrade(target, echo=click.echo)
+    click.echo(f"Applied {count} migration(s)")
+
+
+@click.command('db-status')
+@with_appcontext
+def db_status_command():
+    """List pending schema migrations"""
+    from utils.migrations import pending_migrations
+
+    pending = pending_migrations()
+    if not pending:
+        click.echo("Database is up to date")
+    for version, description in pending:
+        click.echo(f"Pending {version:04d}: {description}")
+
+
+@click.command('import-work-logs')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--user-id', type=int, required=True, help='User the import runs as.')
+@click.option('--chunk-size', type=int, default=None, help='Rows per INSERT batch.')
+@with_appcontext
+def import_work_logs_command(csv_file, user_id, chunk_size):
+    """Stream work logs from a CSV file into the database"""
+    from models.user_model import User
+    from utils.worklog_import import DEFAULT_CHUNK_SIZE, WorkLogImport
+
+    user = db.session.get(User, user_id)
+    if not user:
+        raise click.ClickException(f"User {user_id} not found")
+
+    result = WorkLogImport(user, chunk_size or DEFAULT_CHUNK_SIZE).run(csv_file)
+    for error in result.errors:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {result.imported} work log(s), {result.failed} failed")
+
+
+def register_commands(app):
+    """Register maintenance CLI commands on the Flask app"""
+    app.cli.add_command(rebuild_project_stats_command)
+    app.cli.add_command(db_upgrade_command)
+    app.cli.add_command(db_status_command)
+    app.cli.add_command(import_work_logs_command)
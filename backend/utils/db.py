@@ -1,15 +1,62 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 import os
 
 # Create the database instance
 db = SQLAlchemy()
 
+def _env_int(name, default):
+    """Read an integer setting from the environment"""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+def get_engine_options(uri):
+    """Engine and pool settings, overridable through environment variables"""
+    if uri in ('sqlite://', 'sqlite:///:memory:'):
+        # In-memory SQLite uses a single shared connection, not a pool
+        return {}
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    }
+
+def get_sqlite_pragmas():
+    """PRAGMAs applied to every new SQLite connection.
+
+    WAL lets readers run alongside a writer, and busy_timeout makes a
+    blocked writer wait instead of failing with "database is locked".
+    """
+    return {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'mmap_size': _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'cache_size': _env_int('SQLITE_CACHE_SIZE', -64000),  # negative = KiB
+        'foreign_keys': os.getenv('SQLITE_FOREIGN_KEYS', 'ON')
+    }
+
+def _apply_sqlite_pragmas(engine, pragmas):
+    """Run the PRAGMAs on each connection the engine opens"""
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
 def init_app_db(app):
     """Initialize database with Flask app"""
     # Database configuration
     basedir = os.path.abspath(os.path.dirname(__file__))
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "..", "database.db")}'
+    default_uri = f'sqlite:///{os.path.join(basedir, "..", "database.db")}'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', default_uri)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', get_engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
     app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
     app.config['JWT_SECRET_KEY'] = 'jwt-secret-string-change-in-production'
     
@@ -19,12 +66,22 @@ def init_app_db(app):
     # Import models after db initialization to avoid circular imports
     from models.user_model import User
     from models.project_model import Project
+    from models.project_stats_model import ProjectStats
     from models.task_model import Task
     from models.work_log_model import WorkLog
+    from models.data_version_model import DataVersion
+    
+    from utils.cli import register_commands
+    register_commands(app)
     
     # Create tables
     with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            _apply_sqlite_pragmas(db.engine, get_sqlite_pragmas())
         db.create_all()
+        if app.config.get('AUTO_MIGRATE', os.getenv('AUTO_MIGRATE', 'true').lower() == 'true'):
+            from utils.migrations import upgrade
+            upgrade()
         create_default_admin()
 
 def create_default_admin():
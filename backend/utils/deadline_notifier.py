@@ -1,72 +1,100 @@
 # utils/deadline_notifier.py
 from datetime import datetime, timedelta
 from flask_mail import Message
-from bson import ObjectId
 import traceback
 
-def parse_maybe_datetime(v):
-    """Return a datetime object if v is datetime or ISO string. Otherwise None."""
-    if v is None:
-        return None
-    if isinstance(v, datetime):
-        return v
-    # if it's a string attempt to parse common ISO formats
-    try:
-        # strip timezone Z if present
-        s = str(v)
-        if s.endswith('Z'):
-            s = s[:-1]
-        # Try parsing common formats
-        for fmt in ("%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s, fmt)
-            except:
-                pass
-    except Exception:
-        pass
-    return None
+from utils.mail_delivery import SENT, MailDispatcher
+from utils.mongo_db import oid
+from utils.notifications import deliver
+
+# How long a deadline reminder suppresses another one for the same task
+DEDUPE_WINDOW = timedelta(hours=12)
+
+
+def _recipient_key(task):
+    """The user a reminder goes to: an ObjectId, an id string or an email"""
+    return task.get("user_id") or task.get("owner_id") or task.get("assigned_to")
+
+
+def _load_recipients(db, keys):
+    """Resolve recipient keys to user documents with one $in query; returns {key: user}"""
+    ids, emails = set(), set()
+    for key in keys:
+        if oid(key):
+            ids.add(oid(key))
+        if isinstance(key, str):
+            # legacy string _ids and email addresses
+            ids.add(key)
+            emails.add(key)
+    if not ids and not emails:
+        return {}
+    users = db.users.find(
+        {"$or": [{"_id": {"$in": list(ids)}}, {"email": {"$in": list(emails)}}]},
+        {"email": 1, "username": 1, "first_name": 1}
+    )
+    by_id, by_email = {}, {}
+    for user in users:
+        by_id[user["_id"]] = user
+        if user.get("email"):
+            by_email[user["email"]] = user
+    resolved = {}
+    for key in keys:
+        user = by_id.get(oid(key)) or by_id.get(key) or by_email.get(key)
+        if user:
+            resolved[key] = user
+    return resolved
+
+
+def _recently_notified(db, task_ids, since):
+    """Task ids that already got a deadline notification since ``since``, in one query"""
+    cursor = db.notifications.find(
+        {"task_id": {"$in": task_ids}, "type": "deadline", "created_at": {"$gte": since}},
+        {"task_id": 1}
+    )
+    return {doc["task_id"] for doc in cursor}
+
 
 def send_deadline_alerts(app, db, mail):
     """
     Send email reminders for tasks due within 24 hours and create notification documents.
-    Safe: tolerant of due_date types, avoids duplicate notifications within 24h.
+    Avoids duplicate notifications within 12h. String due dates written before
+    due dates were normalized are converted by init_mongo() on startup (or
+    `flask mongo-backfill-due-dates`); only unparseable ones are skipped.
+
+    A run costs a fixed number of round trips however many tasks are due: one
+    window query, one user $in, one dedupe query and one notification insert.
+    Emails go out through a MailDispatcher pool once every message is built;
+    each notification records how its email fared under ``email``.
     """
     with app.app_context():
         try:
             now = datetime.utcnow()
             next_24h = now + timedelta(hours=24)
 
-            # Build a query that finds tasks with due_date within the next 24 hours.
-            # We can't query reliably if due_date stored as string, so fetch candidates with
-            # due_date exists and filter in Python as well.
-            cursor = db.tasks.find({"due_date": {"$exists": True}, "status": {"$ne": "completed"}})
-
-            for task in cursor:
-                try:
-                    due_raw = task.get("due_date")
-                    due_dt = parse_maybe_datetime(due_raw)
-                    if due_dt is None:
-                        # skip tasks with invalid dates
-                        continue
+            # Only tasks due in the next 24 hours, read from the status_due_date
+            # index; due dates are BSON datetimes (see utils/due_dates.py)
+            tasks = list(db.tasks.find(
+                {
+                    "status": {"$ne": "completed"},
+                    "due_date": {"$gte": now, "$lte": next_24h}
+                },
+                {"title": 1, "due_date": 1, "user_id": 1, "owner_id": 1, "assigned_to": 1}
+            ))
+            tasks = [task for task in tasks if _recipient_key(task)]
+            if not tasks:
+                app.logger.info("Deadline notifier: no tasks due.")
+                return
 
-                    # Accept tasks where due is between now and next_24h (inclusive)
-                    if not (now <= due_dt <= next_24h):
-                        continue
+            recipients = _load_recipients(db, list({_recipient_key(task) for task in tasks}))
+            notified = _recently_notified(db, [task["_id"] for task in tasks], now - DEDUPE_WINDOW)
 
-                    # Find the user
-                    user_id = task.get("user_id") or task.get("owner_id") or task.get("assigned_to")
-                    if not user_id:
-                        # no user - skip
+            messages, notifications = [], []
+            for task in tasks:
+                try:
+                    if task["_id"] in notified:
+                        # already notified recently
                         continue
-
-                    # ensure ObjectId
-                    user_obj = None
-                    try:
-                        user_obj = db.users.find_one({"_id": ObjectId(user_id)})
-                    except Exception:
-                        # maybe user_id is already an ObjectId or string - try both
-                        user_obj = db.users.find_one({"_id": user_id}) or db.users.find_one({"email": user_id})
-
+                    user_obj = recipients.get(_recipient_key(task))
                     if not user_obj:
                         continue
                     user_email = user_obj.get("email")
@@ -74,48 +102,37 @@ def send_deadline_alerts(app, db, mail):
                         continue
 
                     task_name = task.get("title", "Untitled Task")
-                    due_str = due_dt.strftime("%Y-%m-%d %H:%M UTC")
-
-                    # Avoid sending duplicate reminder multiple times in a short window:
-                    # if a notification of type 'deadline' for this task exists and was created
-                    # less than 12 hours ago, skip sending again.
-                    exists = db.notifications.find_one({
-                        "task_id": task["_id"],
-                        "type": "deadline",
-                        "created_at": {"$gte": datetime.utcnow() - timedelta(hours=12)}
-                    })
-                    if exists:
-                        # already notified recently
-                        continue
+                    due_str = task["due_date"].strftime("%Y-%m-%d %H:%M UTC")
 
-                    # Compose and send email
+                    # Compose email
                     subject = "⏰ TaskGrid Reminder: Task deadline within 24 hours"
                     body = (f"Hello {user_obj.get('username') or user_obj.get('first_name') or 'User'},\n\n"
                             f"Your task '{task_name}' is due on {due_str}.\n"
                             f"Please update progress on TaskGrid: {app.config.get('APP_URL', '')}/dashboard\n\n"
                             "— TaskGrid")
 
-                    msg = Message(subject=subject, recipients=[user_email], body=body)
-                    try:
-                        mail.send(msg)
-                        app.logger.info(f"Sent deadline email to {user_email} for task {task.get('_id')}")
-                    except Exception as e:
-                        app.logger.error(f"Failed to send email to {user_email}: {e}")
-
-                    # Log notification in DB
-                    db.notifications.insert_one({
-                        "user_id": ObjectId(user_obj["_id"]) if not isinstance(user_obj["_id"], str) else user_obj["_id"],
+                    messages.append(Message(subject=subject, recipients=[user_email], body=body))
+                    notifications.append({
+                        "user_id": user_obj["_id"],
                         "task_id": task["_id"],
                         "message": f"⏰ Task '{task_name}' is due within 24 hours!",
-                        "timestamp": datetime.utcnow(),
                         "type": "deadline",
-                        "status": "unread",
-                        "created_at": datetime.utcnow()
                     })
 
                 except Exception as task_e:
                     app.logger.error(f"Error processing task {task.get('_id')}: {task_e}\n{traceback.format_exc()}")
 
-            app.logger.info("Deadline notifier: scan finished.")
+            results = MailDispatcher(app, mail).send_all(messages)
+            for notification, message, result in zip(notifications, messages, results):
+                notification["email"] = result._asdict()
+                if result.status != SENT:
+                    app.logger.error(f"Failed to send email to {message.recipients[0]} "
+                                     f"after {result.attempts} attempt(s): {result.error}")
+            sent = sum(result.status == SENT for result in results)
+            app.logger.info(f"Deadline notifier: {sent}/{len(messages)} email(s) sent.")
+
+            # One unordered insert_many plus one counter bulk_write for the whole run
+            deliver(notifications)
+            app.logger.info(f"Deadline notifier: scan finished, {len(notifications)} notification(s).")
         except Exception as e:
             app.logger.error(f"send_deadline_alerts failed: {e}\n{traceback.format_exc()}")
@@ -0,0 +1,88 @@
+import os
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+# Mongo task due dates.
+#
+# due_date is stored as a BSON datetime (naive UTC), so the deadline notifier
+# can ask the status_due_date index for the tasks due in a time window.
+# Clients send 'YYYY-MM-DD' or an ISO 8601 datetime; older documents still
+# hold those strings until backfill_due_dates() converts them, which
+# init_mongo() does on startup unless MONGO_BACKFILL_DUE_DATES=false. Every
+# write parses due dates, so the backfill only has legacy data to convert:
+# once a run completes it is recorded in the maintenance collection and later
+# startups skip the string scan. `flask mongo-backfill-due-dates` always runs.
+
+BACKFILL_ON_STARTUP = os.getenv('MONGO_BACKFILL_DUE_DATES', 'true').lower() == 'true'
+
+BACKFILL_JOB = 'due_date_backfill'
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def parse_due_date(value):
+    """Naive-UTC datetime from a datetime, 'YYYY-MM-DD' or ISO 8601 string; None if unparseable"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value.strip():
+        text = value.strip()
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    else:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def backfill_due_dates(tasks, batch_size=BACKFILL_BATCH_SIZE, echo=None):
+    """Convert string due dates to datetimes, in _id order and small batches.
+
+    Runs online: each update only applies while the document still holds the
+    string that was read, so concurrent edits win. Converted documents get a
+    new updated_at, so cached ETags change. Strings that do not parse are
+    left alone and counted. Returns (converted, unparseable).
+    """
+    converted = unparseable = 0
+    last_id = None
+    while True:
+        query = {'due_date': {'$type': 'string'}}
+        if last_id is not None:
+            query['_id'] = {'$gt': last_id}
+        batch = list(tasks.find(query, {'due_date': 1}).sort('_id', 1).limit(batch_size))
+        if not batch:
+            return converted, unparseable
+        operations = []
+        for doc in batch:
+            due = parse_due_date(doc['due_date'])
+            if due is None and doc['due_date'].strip():
+                unparseable += 1
+                continue
+            operations.append(UpdateOne(
+                {'_id': doc['_id'], 'due_date': doc['due_date']},
+                {'$set': {'due_date': due, 'updated_at': datetime.utcnow()}}
+            ))
+        if operations:
+            converted += tasks.bulk_write(operations, ordered=False).modified_count
+        last_id = batch[-1]['_id']
+        if echo:
+            echo(f"Converted {converted} due date(s) through {last_id}")
+
+
+def backfill_recorded(db):
+    """Whether a due date backfill has already completed against ``db``"""
+    return db.maintenance.find_one({'_id': BACKFILL_JOB}, {'_id': 1}) is not None
+
+
+def record_backfill(db, converted, unparseable):
+    """Record a completed backfill so init_mongo() stops running it"""
+    db.maintenance.update_one(
+        {'_id': BACKFILL_JOB},
+        {'$set': {'completed_at': datetime.utcnow(), 'converted': converted, 'unparseable': unparseable}},
+        upsert=True
+    )
@@ -0,0 +1,43 @@
+import hashlib
+import json
+
+from flask import make_response, request
+
+# Conditional GET support.
+#
+# Handlers compute a cheap fingerprint of the data a response depends on,
+# hash it into a strong ETag and only serialize the body when the client's
+# If-None-Match does not match. SQL handlers use the shared write counters
+# of utils/versions.py; Mongo handlers use (count, MAX(updated_at)) over the
+# documents the payload reads.
+
+
+def make_etag(*parts):
+    """Hash fingerprint parts into an (unquoted) strong ETag value"""
+    raw = json.dumps(parts, default=str, separators=(',', ':'))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def etag_response(etag, build):
+    """Return 304 if the client already has ``etag``, else build() with the ETag set"""
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    # Let browsers keep the body but revalidate on every navigation
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def mongo_fingerprint(collection, query=None):
+    """(count, max updated_at) over a Mongo filter, in one aggregation"""
+    pipeline = [
+        {'$match': query or {}},
+        {'$group': {'_id': None, 'count': {'$sum': 1}, 'last_update': {'$max': '$updated_at'}}}
+    ]
+    for row in collection.aggregate(pipeline):
+        return [row['count'], row['last_update']]
+    return [0, None]
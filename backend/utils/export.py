@@ -0,0 +1,52 @@
+import csv
+import io
+from datetime import date, datetime
+
+from utils.json_provider import dumps_bytes
+
+# Streaming export helpers shared by the SQL and Mongo backends.
+#
+# Rows come from a generator (SQLAlchemy yield_per or a Mongo cursor with a
+# batch_size) and are encoded one at a time, so a response of any size is
+# produced with flat memory.
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dumps_bytes(value).decode()
+    return value
+
+
+def ndjson_lines(rows):
+    """Encode each row as one JSON line"""
+    for row in rows:
+        yield dumps_bytes(row) + b'\n'
+
+
+def csv_lines(rows):
+    """Encode rows as CSV; the header comes from the first row's keys"""
+    buffer = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerow({key: _csv_value(value) for key, value in row.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+
+def encode_rows(rows, export_format):
+    """Return (line generator, mimetype) for an export format"""
+    if export_format == 'csv':
+        return csv_lines(rows), EXPORT_FORMATS['csv']
+    return ndjson_lines(rows), EXPORT_FORMATS['ndjson']
@@ -1,15 +1,19 @@
+import base64
+import json
 from datetime import datetime, date, timedelta
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
+from utils.identity import current_identity
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
 def admin_required(f):
     """Decorator to require admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        from models.user_model import User
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         if not user or user.role != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
@@ -21,9 +25,7 @@ def manager_or_admin_required(f):
     """Decorator to require manager or admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        from models.user_model import User
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         
         if not user or user.role not in ['admin', 'manager']:
             return jsonify({'error': 'Manager or admin access required'}), 403
@@ -90,21 +92,20 @@ def get_month_start_end(target_date=None):
     
     return month_start, month_end
 
-def calculate_business_days(start_date, end_date):
-    """Calculate number of business days between two dates"""
+def calculate_business_days(start_date, end_date, calendar=None):
+    """Calculate number of business days from start_date through end_date.
+
+    Uses the default BusinessCalendar (Mon-Fri plus BUSINESS_HOLIDAYS) unless
+    a workspace calendar is passed; see utils.business_calendar for the
+    batched version.
+    """
     if not start_date or not end_date:
         return 0
     
-    business_days = 0
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # Monday is 0, Sunday is 6
-        if current_date.weekday() < 5:  # Monday to Friday
-            business_days += 1
-        current_date += timedelta(days=1)
-    
-    return business_days
+    if calendar is None:
+        from utils.business_calendar import default_calendar
+        calendar = default_calendar()
+    return calendar.count_inclusive(start_date, end_date)
 
 def format_duration(hours):
     """Format hours into human-readable duration"""
@@ -157,6 +158,57 @@ def paginate_query(query, page=1, per_page=20):
             'has_prev': False
         }
 
+def encode_cursor(sort_value, row_id):
+    """Encode a (sort value, id) keyset position as an opaque token"""
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token, sort_column):
+    """Decode a cursor token into (sort value, id); raises ValueError if malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        python_type = sort_column.type.python_type
+        if python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        elif python_type is date:
+            sort_value = date.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except Exception as e:
+        raise ValueError('Invalid cursor') from e
+
+def get_page_args(args):
+    """Read cursor/limit request args; returns None when no page was requested"""
+    if 'cursor' not in args and 'limit' not in args:
+        return None
+    limit = max(1, min(safe_int(args.get('limit'), DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    return args.get('cursor') or None, limit
+
+def get_list_arg(args, name):
+    """Read a comma-separated request arg; returns None when it was not sent"""
+    if name not in args:
+        return None
+    return [item.strip() for item in args.get(name, '').split(',') if item.strip()]
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Order a query newest first by (sort_column, id) and seek past the cursor.
+
+    Fetches one extra row so keyset_page() can tell whether another page
+    exists. Unlike OFFSET, the cost of a page does not depend on its depth
+    as long as an index on (sort_column, id) exists.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column)
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+    return query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+def keyset_page(items, limit, sort_key, id_key='id'):
+    """Trim the look-ahead row of serialized items and return (items, next_cursor)"""
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(items[-1][sort_key], items[-1][id_key])
+
 def safe_float(value, default=0.0):
     """Safely convert value to float"""
     try:
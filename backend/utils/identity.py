@@ -0,0 +1,91 @@
+import os
+from datetime import timedelta
+
+from flask import current_app, g
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt
+
+# Request-scoped caller identity.
+#
+# Access tokens carry the caller's role and display name as claims, so
+# handlers can authorize without loading the user row. Access tokens are
+# short-lived; clients renew them at /auth/refresh, which re-reads the user,
+# so role changes and deactivations take effect within one access lifetime.
+
+ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', '15')))
+REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv('JWT_REFRESH_TOKEN_DAYS', '30')))
+
+
+class Identity:
+    """The authenticated caller, as described by the access token"""
+
+    __slots__ = ('id', 'role', 'username', 'name')
+
+    def __init__(self, id, role, username=None, name=None):
+        self.id = id
+        self.role = role
+        self.username = username
+        self.name = name
+
+    @property
+    def is_manager(self):
+        return self.role in ['admin', 'manager']
+
+    def __repr__(self):
+        return f'<Identity {self.id} {self.role}>'
+
+
+def identity_claims(user):
+    """Role and display-name claims for a User row or a Mongo user document"""
+    get = user.get if isinstance(user, dict) else lambda key, default=None: getattr(user, key, default)
+    return {
+        'role': get('role') or 'team_member',
+        'username': get('username'),
+        'name': f"{get('first_name') or ''} {get('last_name') or ''}".strip()
+    }
+
+
+def identity_from_user(user_id, user):
+    """Build an Identity from a freshly loaded user"""
+    claims = identity_claims(user)
+    return Identity(user_id, claims['role'], claims['username'], claims['name'])
+
+
+def issue_tokens(user_id, user, refresh=True):
+    """Access token with identity claims, plus a refresh token unless ``refresh`` is False"""
+    tokens = {
+        'access_token': create_access_token(
+            identity=user_id,
+            additional_claims=identity_claims(user),
+            expires_delta=ACCESS_TOKEN_EXPIRES
+        ),
+        'expires_in': int(ACCESS_TOKEN_EXPIRES.total_seconds())
+    }
+    if refresh:
+        tokens['refresh_token'] = create_refresh_token(identity=user_id, expires_delta=REFRESH_TOKEN_EXPIRES)
+    return tokens
+
+
+def register_identity_loader(blueprint, loader, subject=str):
+    """Let ``blueprint``'s app resolve tokens issued before identity claims existed.
+
+    ``loader(user_id)`` returns an Identity or None and costs one lookup.
+    JWT subjects are always strings; ``subject`` converts them back to the
+    backend's id type (``int`` for SQL users).
+    """
+    def record(state):
+        state.app.extensions.setdefault('identity_loader', loader)
+        state.app.extensions.setdefault('identity_subject', subject)
+    blueprint.record_once(record)
+
+
+def current_identity():
+    """The caller's Identity (or None), built once per request from the verified JWT"""
+    if 'identity' not in g:
+        claims = get_jwt()
+        user_id = current_app.extensions.get('identity_subject', str)(claims['sub'])
+        if 'role' in claims:
+            g.identity = Identity(user_id, claims['role'], claims.get('username'), claims.get('name'))
+        else:
+            loader = current_app.extensions.get('identity_loader')
+            g.identity = loader(user_id) if loader else None
+    return g.identity
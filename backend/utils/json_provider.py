@@ -0,0 +1,79 @@
+import decimal
+import json
+from datetime import date, datetime, time, timezone
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+# App-wide JSON encoding.
+#
+# Mongo documents are serialized as they come from the driver: ObjectIds
+# become hex strings and datetimes ISO 8601 in the same pass, instead of
+# deep-copying each document through to_str_id() first. Naive datetimes are
+# stored as UTC, so they are written with an explicit +00:00 offset.
+
+ORJSON_OPTIONS = (orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def json_default(value):
+    """Encode values the underlying encoder does not handle natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps_bytes(obj, indent=False, sort_keys=False):
+    """Serialize ``obj`` to UTF-8 JSON bytes with the fastest available encoder"""
+    if orjson is not None:
+        option = ORJSON_OPTIONS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=json_default, option=option)
+    return json.dumps(
+        obj, default=json_default, ensure_ascii=False, sort_keys=sort_keys,
+        indent=2 if indent else None, separators=None if indent else (',', ':')
+    ).encode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when it is installed"""
+
+    # Keep the key order of to_dict() and the stored documents
+    sort_keys = False
+    default = staticmethod(json_default)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=self.sort_keys).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps_bytes(obj, indent=indent, sort_keys=self.sort_keys) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install the fast JSON provider on an app"""
+    app.json = FastJSONProvider(app)
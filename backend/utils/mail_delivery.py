@@ -0,0 +1,158 @@
+import queue
+import smtplib
+import threading
+import time
+from collections import namedtuple
+
+# Pooled SMTP delivery.
+#
+# A handful of worker threads each hold one SMTP session (mail.connect()) and
+# pull messages off a shared queue, so a batch pays for TLS and login once per
+# worker instead of once per message. Sends through one server share a token
+# bucket (MAIL_RATE_LIMIT messages/second, 0 = unlimited) however many
+# dispatchers are running. Transient failures (dropped connections, 4xx
+# replies) are retried on a fresh session with exponential backoff; 5xx
+# replies fail the message straight away.
+
+SENT = 'sent'
+FAILED = 'failed'
+
+DEFAULT_WORKERS = 4
+DEFAULT_RATE_LIMIT = 0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+
+Delivery = namedtuple('Delivery', ['status', 'attempts', 'error'])
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing ``rate`` acquisitions per second"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def rate_limiter(server, rate):
+    """The process-wide limiter for one SMTP server"""
+    with _limiters_lock:
+        limiter = _limiters.get(server)
+        if limiter is None or limiter.rate != rate:
+            limiter = _limiters[server] = RateLimiter(rate)
+        return limiter
+
+
+def is_transient(error):
+    """Whether a failed send is worth retrying on a new connection"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    # socket errors and timeouts
+    return isinstance(error, OSError)
+
+
+class MailDispatcher:
+    """Send a batch of flask_mail Messages through a bounded pool of SMTP sessions"""
+
+    def __init__(self, app, mail, workers=None, rate_limit=None, max_retries=None, backoff=None):
+        config = app.config
+        self.app = app
+        self.mail = mail
+        self.workers = max(1, workers or config.get('MAIL_DELIVERY_WORKERS', DEFAULT_WORKERS))
+        rate = config.get('MAIL_RATE_LIMIT', DEFAULT_RATE_LIMIT) if rate_limit is None else rate_limit
+        self.limiter = rate_limiter(config.get('MAIL_SERVER'), rate)
+        self.max_retries = config.get('MAIL_MAX_RETRIES', DEFAULT_MAX_RETRIES) if max_retries is None else max_retries
+        self.backoff = config.get('MAIL_RETRY_BACKOFF', DEFAULT_RETRY_BACKOFF) if backoff is None else backoff
+
+    def send_all(self, messages):
+        """Deliver ``messages``; returns one Delivery per message, in order"""
+        results = [None] * len(messages)
+        if not messages:
+            return results
+        jobs = queue.Queue()
+        for index, message in enumerate(messages):
+            jobs.put((index, message))
+        threads = [
+            threading.Thread(target=self._work, args=(jobs, results), daemon=True)
+            for _ in range(min(self.workers, len(messages)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _work(self, jobs, results):
+        """Worker loop: one SMTP session, reopened only after a failure"""
+        with self.app.app_context():
+            session = None
+            try:
+                while True:
+                    try:
+                        index, message = jobs.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        results[index], session = self._send(message, session)
+                    except Exception as e:
+                        results[index] = Delivery(FAILED, 0, str(e))
+            finally:
+                self._close(session)
+
+    def _send(self, message, session):
+        """Send one message with retries; returns (Delivery, session to reuse)"""
+        attempt = 0
+        while True:
+            attempt += 1
+            self.limiter.acquire()
+            try:
+                if session is None:
+                    session = self.mail.connect()
+                    session.__enter__()
+                session.send(message)
+                return Delivery(SENT, attempt, None), session
+            except Exception as e:
+                # The session may be half-way through a transaction; start over
+                self._close(session)
+                session = None
+                if not is_transient(e) or attempt > self.max_retries:
+                    return Delivery(FAILED, attempt, str(e)), None
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+    @staticmethod
+    def _close(session):
+        if session is None:
+            return
+        try:
+            session.__exit__(None, None, None)
+        except Exception:
+            # QUIT on a dropped connection
+            pass
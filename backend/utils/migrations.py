@@ -0,0 +1,115 @@
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from utils.db import db
+
+# Versioned schema migrations for the SQL backend.
+#
+# create_all() only creates missing tables, so anything added to an existing
+# table (indexes, backfills) ships as a migration here. Applied versions are
+# recorded in ``schema_migrations``; every step must be safe to re-run, since
+# concurrently starting workers may race on the same version.
+
+
+def _backfill_project_stats():
+    from utils.rollups import rebuild_project_stats
+    rebuild_project_stats()
+
+
+def _create_search_indexes():
+    # FTS5 is SQLite-only; other databases search with LIKE filters instead
+    if db.engine.dialect.name != 'sqlite':
+        return
+    from utils.search import FTS_INDEXES, fts_statements
+    for name in FTS_INDEXES:
+        for statement in fts_statements(name):
+            db.session.execute(text(statement))
+
+
+def _seed_data_versions():
+    from utils.versions import seed_data_versions
+    seed_data_versions()
+
+
+MIGRATIONS = [
+    (1, 'Keyset pagination indexes', [
+        'CREATE INDEX IF NOT EXISTS ix_tasks_created_at_id ON tasks (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_projects_created_at_id ON projects (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_work_logs_work_date_id ON work_logs (work_date, id)',
+        'CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id)',
+    ]),
+    (2, 'Indexes for task, project and work log filters', [
+        'CREATE INDEX IF NOT EXISTS ix_tasks_assigned_to_status ON tasks (assigned_to, status)',
+        'CREATE INDEX IF NOT EXISTS ix_tasks_project_id_status ON tasks (project_id, status)',
+        'CREATE INDEX IF NOT EXISTS ix_tasks_created_by ON tasks (created_by)',
+        'CREATE INDEX IF NOT EXISTS ix_tasks_due_date ON tasks (due_date)',
+        'CREATE INDEX IF NOT EXISTS ix_projects_owner_id ON projects (owner_id)',
+        'CREATE INDEX IF NOT EXISTS ix_work_logs_user_id_work_date ON work_logs (user_id, work_date)',
+        'CREATE INDEX IF NOT EXISTS ix_work_logs_task_id ON work_logs (task_id)',
+    ]),
+    (3, 'Backfill project_stats rollups', _backfill_project_stats),
+    (4, 'updated_at indexes for ETag fingerprints and exports', [
+        'CREATE INDEX IF NOT EXISTS ix_tasks_updated_at ON tasks (updated_at)',
+        'CREATE INDEX IF NOT EXISTS ix_projects_updated_at ON projects (updated_at)',
+        'CREATE INDEX IF NOT EXISTS ix_work_logs_updated_at ON work_logs (updated_at)',
+        'CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at)',
+    ]),
+    (5, 'Full-text search indexes for tasks and projects', _create_search_indexes),
+    (6, 'Shared data version counters for ETags and dashboard caching', _seed_data_versions),
+]
+
+
+def _ensure_version_table():
+    db.session.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'version INTEGER PRIMARY KEY, '
+        'description VARCHAR(200) NOT NULL, '
+        'applied_at TIMESTAMP NOT NULL)'
+    ))
+    db.session.commit()
+
+
+def applied_versions():
+    """Return the set of migration versions already applied"""
+    _ensure_version_table()
+    rows = db.session.execute(text('SELECT version FROM schema_migrations'))
+    return {row[0] for row in rows}
+
+
+def pending_migrations():
+    """Return (version, description) pairs not yet applied, in order"""
+    applied = applied_versions()
+    return [(version, description) for version, description, _ in MIGRATIONS if version not in applied]
+
+
+def upgrade(target=None, echo=None):
+    """Apply pending migrations up to ``target`` (all by default), each in its own transaction"""
+    applied = applied_versions()
+    count = 0
+    for version, description, step in MIGRATIONS:
+        if version in applied or (target is not None and version > target):
+            continue
+        if echo:
+            echo(f"Applying {version:04d}: {description}")
+        try:
+            if callable(step):
+                step()
+            else:
+                for statement in step:
+                    db.session.execute(text(statement))
+            db.session.execute(
+                text('INSERT INTO schema_migrations (version, description, applied_at) '
+                     'VALUES (:version, :description, :applied_at)'),
+                {'version': version, 'description': description, 'applied_at': datetime.utcnow()}
+            )
+            db.session.commit()
+            count += 1
+        except IntegrityError:
+            # Another worker recorded this version first
+            db.session.rollback()
+        except Exception:
+            db.session.rollback()
+            raise
+    return count
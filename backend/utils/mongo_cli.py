@@ -0,0 +1,74 @@
+import click
+
+# Maintenance commands for the MongoDB backend, e.g. ``flask mongo-indexes``.
+
+
+@click.command('mongo-indexes')
+@click.option('--apply', 'apply_missing', is_flag=True, help='Create missing registered indexes first.')
+@click.option('--check', is_flag=True, help='Exit non-zero when indexes are missing or conflicting.')
+def mongo_indexes_command(apply_missing, check):
+    """Report missing, extra, conflicting and unused MongoDB indexes"""
+    from utils.mongo_db import get_database
+    from utils.mongo_indexes import ensure_indexes, index_report
+
+    db = get_database()
+    if apply_missing:
+        for collection, name, error in ensure_indexes(db):
+            click.echo(f"Could not create {collection}.{name}: {error}", err=True)
+
+    problems = 0
+    for entry in index_report(db):
+        collection = entry['collection']
+        for name in entry['missing']:
+            click.echo(f"{collection}: missing {name}")
+        for name in entry['conflicting']:
+            click.echo(f"{collection}: conflicting {name} (keys differ from the registry)")
+        for name in entry['extra']:
+            click.echo(f"{collection}: extra {name} (not in the registry)")
+        if entry['unused'] is None:
+            click.echo(f"{collection}: usage unavailable ($indexStats not permitted)")
+        else:
+            for name in entry['unused']:
+                click.echo(f"{collection}: unused {name} (no accesses since server start)")
+        problems += len(entry['missing']) + len(entry['conflicting'])
+
+    if not problems:
+        click.echo("All registered indexes are present")
+    elif check:
+        raise click.ClickException(f"{problems} index problem(s)")
+
+
+@click.command('mongo-backfill-participants')
+@click.option('--batch-size', type=int, default=None, help='Tasks per read/update round trip.')
+def mongo_backfill_participants_command(batch_size):
+    """Set participants on tasks written before the field existed"""
+    from utils.mongo_db import tasks_col, users_col
+    from utils.participants import BACKFILL_BATCH_SIZE, backfill_task_participants
+
+    count = backfill_task_participants(tasks_col, users_col, batch_size or BACKFILL_BATCH_SIZE, echo=click.echo)
+    click.echo(f"Backfilled participants on {count} task(s)")
+    remaining = tasks_col.count_documents({'participants': {'$exists': False}})
+    if not remaining:
+        click.echo("All tasks have participants; MONGO_TASK_ACCESS_LEGACY=false can be set")
+
+
+@click.command('mongo-backfill-due-dates')
+@click.option('--batch-size', type=int, default=None, help='Tasks per read/update round trip.')
+def mongo_backfill_due_dates_command(batch_size):
+    """Convert task due dates stored as strings to datetimes"""
+    from utils.mongo_db import get_database
+    from utils.due_dates import BACKFILL_BATCH_SIZE, backfill_due_dates, record_backfill
+
+    db = get_database()
+    converted, unparseable = backfill_due_dates(db.tasks, batch_size or BACKFILL_BATCH_SIZE, echo=click.echo)
+    record_backfill(db, converted, unparseable)
+    click.echo(f"Converted {converted} due date(s)")
+    if unparseable:
+        click.echo(f"{unparseable} due date(s) could not be parsed and were left as strings", err=True)
+
+
+def register_mongo_commands(app):
+    """Register MongoDB maintenance CLI commands on the Flask app"""
+    app.cli.add_command(mongo_indexes_command)
+    app.cli.add_command(mongo_backfill_participants_command)
+    app.cli.add_command(mongo_backfill_due_dates_command)
@@ -1,6 +1,8 @@
 import os
+from functools import lru_cache
 from typing import Optional
 from pymongo import MongoClient
+from pymongo.write_concern import WriteConcern
 from pymongo.errors import ConnectionFailure, ConfigurationError, PyMongoError
 from bson import ObjectId
 
@@ -118,7 +120,55 @@ worklogs_col = _db["work_logs"]
 notifications_col = _db["notifications"]
 
 
+# Write concern per operation class: account (users), board (tasks and
+# projects) and notification. MONGO_WRITE_CONCERN_<CLASS> is "majority", a
+# number of nodes, or 0 for fire-and-forget; unset keeps the client default.
+# MONGO_WRITE_TIMEOUT_MS bounds how long a write waits for replication.
+WRITE_CLASSES = ("account", "board", "notification")
+
+
+def write_concern(kind: str) -> Optional[WriteConcern]:
+    """Configured WriteConcern for an operation class, or None for the client default."""
+    if kind not in WRITE_CLASSES:
+        raise ValueError(f"Unknown write class '{kind}'")
+    w = os.getenv(f"MONGO_WRITE_CONCERN_{kind.upper()}")
+    if not w:
+        return None
+    timeout = os.getenv("MONGO_WRITE_TIMEOUT_MS")
+    return WriteConcern(
+        w=int(w) if w.isdigit() else w,
+        wtimeout=int(timeout) if timeout and w != "0" else None,
+    )
+
+
+@lru_cache(maxsize=None)
+def writer(collection, kind: str):
+    """``collection`` with the write concern of operation class ``kind``."""
+    concern = write_concern(kind)
+    return collection.with_options(write_concern=concern) if concern else collection
+
+
 # 🧩 ADD THIS FUNCTION BELOW — it’s what your app_mongo.py expects
+def _backfill_due_dates(db):
+    """Convert legacy string due dates so the deadline notifier's window query sees them; runs
+    until one pass completes"""
+    from utils.due_dates import BACKFILL_ON_STARTUP, backfill_due_dates, backfill_recorded, record_backfill
+    if not BACKFILL_ON_STARTUP:
+        return
+    try:
+        if backfill_recorded(db):
+            return
+        converted, unparseable = backfill_due_dates(db.tasks)
+        record_backfill(db, converted, unparseable)
+    except PyMongoError as e:
+        print(f"[MongoDB] ⚠️ Due date backfill failed: {e}")
+        return
+    if converted:
+        print(f"[MongoDB] 🔄 Converted {converted} string due date(s) to datetimes")
+    if unparseable:
+        print(f"[MongoDB] ⚠️ {unparseable} task due date(s) could not be parsed and get no reminders")
+
+
 def init_mongo(app=None):
     """
     Initialize MongoDB connection for Flask app.
@@ -126,6 +176,10 @@ def init_mongo(app=None):
     try:
         client = get_client()
         db = get_database()
+        from utils.mongo_indexes import ensure_indexes
+        for collection, name, error in ensure_indexes(db):
+            print(f"[MongoDB] ⚠️ Index {collection}.{name} not created: {error}")
+        _backfill_due_dates(db)
         print(f"[MongoDB] ✅ Connected successfully to database: {db.name}")
         print(f"[MongoDB] 📂 Collections available: {db.list_collection_names()}")
         return db
@@ -0,0 +1,118 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+# Declarative MongoDB index registry.
+#
+# Every index the Mongo backend relies on is listed here, by collection, with
+# an explicit name. init_mongo() applies the registry on startup; creating an
+# index that already exists with the same spec is a no-op, so restarts are
+# cheap. ``flask mongo-indexes`` compares the registry with what the server
+# has and with $indexStats usage counters.
+
+
+# Only index real strings, so legacy documents without the field don't collide on null
+_STRING = {'$type': 'string'}
+
+INDEXES = {
+    'users': [
+        IndexModel([('username', ASCENDING)], name='username_unique', unique=True,
+                   partialFilterExpression={'username': _STRING}),
+        IndexModel([('email', ASCENDING)], name='email_unique', unique=True,
+                   partialFilterExpression={'email': _STRING}),
+    ],
+    'tasks': [
+        # Access checks: {participants: uid} sorted newest first (multikey)
+        IndexModel([('participants', ASCENDING), ('created_at', DESCENDING)], name='participants_created_at'),
+        IndexModel([('project_id', ASCENDING)], name='project_id'),
+        # Deadline notifier: open tasks by due date
+        IndexModel([('status', ASCENDING), ('due_date', ASCENDING)], name='status_due_date'),
+        IndexModel([('title', TEXT), ('description', TEXT)], name='tasks_text',
+                   weights={'title': 10, 'description': 1}),
+    ],
+    'projects': [
+        IndexModel([('owner_id', ASCENDING)], name='owner_id'),
+        IndexModel([('name', TEXT), ('description', TEXT)], name='projects_text',
+                   weights={'name': 10, 'description': 1}),
+    ],
+    'work_logs': [
+        IndexModel([('user_id', ASCENDING), ('work_date', DESCENDING)], name='user_id_work_date'),
+        IndexModel([('task_id', ASCENDING)], name='task_id'),
+    ],
+    'notifications': [
+        # Inbox pages: keyset on (timestamp, _id) within a user, newest first
+        IndexModel([('user_id', ASCENDING), ('timestamp', DESCENDING), ('_id', DESCENDING)],
+                   name='user_id_timestamp_id'),
+        # Deadline notifier: "already reminded about this task recently?"
+        IndexModel([('task_id', ASCENDING), ('type', ASCENDING), ('created_at', DESCENDING)],
+                   name='task_id_type_created_at'),
+    ],
+}
+
+
+def _key(spec):
+    """Comparable key pattern from an IndexModel document or index_information() entry"""
+    key = []
+    for field, direction in (spec.items() if isinstance(spec, dict) else spec):
+        # The server reports text indexes as _fts/_ftsx instead of the indexed fields
+        if direction == TEXT or field in ('_fts', '_ftsx'):
+            if ('_fts', TEXT) not in key:
+                key.extend([('_fts', TEXT), ('_ftsx', 1)])
+            continue
+        key.append((field, direction))
+    return key
+
+
+def ensure_indexes(db, registry=None):
+    """Create every registered index; returns a list of (collection, index name, error) failures.
+
+    Indexes are created one at a time so a conflict (an index of the same
+    name with a different spec, or duplicates blocking a unique index) only
+    skips that index.
+    """
+    failures = []
+    for collection, models in (registry or INDEXES).items():
+        for model in models:
+            try:
+                db[collection].create_indexes([model])
+            except OperationFailure as e:
+                failures.append((collection, model.document['name'], str(e)))
+    return failures
+
+
+def index_usage(collection):
+    """{index name: accesses since server start} from $indexStats, or None when unavailable"""
+    try:
+        return {
+            stat['name']: stat['accesses']['ops']
+            for stat in collection.aggregate([{'$indexStats': {}}])
+        }
+    except OperationFailure:
+        return None
+
+
+def index_report(db, registry=None):
+    """Compare registered indexes with the server's, per collection.
+
+    Each entry lists ``missing`` (registered, not on the server), ``extra``
+    (on the server, not registered), ``conflicting`` (same name, different
+    keys) and ``unused`` (no accesses in $indexStats; None when the server
+    does not report usage).
+    """
+    report = []
+    for collection, models in (registry or INDEXES).items():
+        existing = db[collection].index_information()
+        expected = {model.document['name']: _key(model.document['key']) for model in models}
+        usage = index_usage(db[collection])
+        report.append({
+            'collection': collection,
+            'missing': [name for name in expected if name not in existing],
+            'extra': [name for name in existing if name != '_id_' and name not in expected],
+            'conflicting': [
+                name for name, key in expected.items()
+                if name in existing and _key(existing[name]['key']) != key
+            ],
+            'unused': None if usage is None else [
+                name for name in existing if name != '_id_' and usage.get(name) == 0
+            ],
+        })
+    return report
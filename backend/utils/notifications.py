@@ -0,0 +1,162 @@
+import base64
+import json
+from collections import Counter
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import DESCENDING, UpdateOne
+
+from utils.helpers import encode_cursor
+from utils.mongo_db import notifications_col, oid, users_col, writer
+
+# Per-user notification inbox.
+#
+# Notifications are addressed to one user each (user_id), so an inbox page
+# is a keyset scan of the user_id_timestamp_id index, newest first. Each user
+# document carries ``unread_count``, adjusted with $inc as notifications are
+# delivered and marked read, so polling for the badge reads one field instead
+# of counting. New users start at 0; users created before the counter existed
+# get it initialized by their first delivery, never by a read, so no $inc can
+# land between counting and storing the count.
+#
+# Legacy notifications may have string or missing timestamps. A descending
+# sort puts those after every datetime (strings, then nulls), so a cursor
+# remembers which kind of value it stopped at.
+
+UNREAD = 'unread'
+READ = 'read'
+
+
+def _user_keys(uid):
+    """user_id values a user's notifications may be stored under (ObjectId or legacy string)"""
+    keys = [str(uid)]
+    if oid(uid):
+        keys.insert(0, oid(uid))
+    return keys
+
+
+def _cursor_timestamp(timestamp):
+    """JSON form of a timestamp for a cursor; legacy strings are tagged so they decode as strings"""
+    if isinstance(timestamp, datetime):
+        return timestamp.isoformat()
+    if isinstance(timestamp, str):
+        return {'string': timestamp}
+    return None
+
+
+def decode_inbox_cursor(token):
+    """(timestamp, ObjectId) from a cursor made by inbox_page(); raises ValueError if malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        timestamp, notification_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(timestamp, dict):
+            timestamp = str(timestamp['string'])
+        elif timestamp is not None:
+            timestamp = datetime.fromisoformat(timestamp)
+        return timestamp, ObjectId(notification_id)
+    except Exception as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _after(timestamp, notification_id):
+    """Clauses matching notifications that sort after the cursor position"""
+    clauses = [{'timestamp': timestamp, '_id': {'$lt': notification_id}}]
+    if isinstance(timestamp, datetime):
+        clauses += [{'timestamp': {'$lt': timestamp}}, {'timestamp': {'$type': 'string'}}, {'timestamp': None}]
+    elif isinstance(timestamp, str):
+        clauses += [{'timestamp': {'$lt': timestamp}}, {'timestamp': None}]
+    return clauses
+
+
+def inbox_page(uid, cursor=None, limit=50, status=None):
+    """One page of a user's notifications, newest first; returns (items, next_cursor)"""
+    query = {'user_id': {'$in': _user_keys(uid)}}
+    if status:
+        query['status'] = status
+    if cursor:
+        query['$or'] = _after(*decode_inbox_cursor(cursor))
+    items = list(
+        notifications_col.find(query)
+        .sort([('timestamp', DESCENDING), ('_id', DESCENDING)])
+        .limit(limit + 1)
+    )
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor(_cursor_timestamp(last.get('timestamp')), str(last['_id']))
+
+
+def _count_unread(uid):
+    return notifications_col.count_documents({'user_id': {'$in': _user_keys(uid)}, 'status': UNREAD})
+
+
+def unread_count(uid):
+    """The user's unread counter; counted, not stored, for users who have no counter yet"""
+    user = users_col.find_one({'_id': oid(uid)}, {'unread_count': 1})
+    if not user:
+        return 0
+    if 'unread_count' in user:
+        return max(0, user['unread_count'])
+    return _count_unread(uid)
+
+
+def _adjust_unread(counts):
+    """$inc unread_count by user id; users whose counter is not initialized yet are skipped"""
+    operations = [
+        UpdateOne({'_id': user_id, 'unread_count': {'$exists': True}}, {'$inc': {'unread_count': delta}})
+        for user_id, delta in counts.items()
+        if delta and isinstance(user_id, ObjectId)
+    ]
+    if operations:
+        writer(users_col, 'notification').bulk_write(operations, ordered=False)
+
+
+def _initialize_unread(counts):
+    """Give recipients without a counter one, counted after their new notifications were inserted;
+    returns the ids of the users it initialized"""
+    missing = [user['_id'] for user in users_col.find(
+        {'_id': {'$in': [user_id for user_id in counts if isinstance(user_id, ObjectId)]},
+         'unread_count': {'$exists': False}},
+        {'_id': 1}
+    )]
+    # One pipeline update each: if another delivery set the counter meanwhile,
+    # $ifNull keeps it and this delivery adds its own notifications instead
+    operations = [
+        UpdateOne({'_id': user_id}, [{'$set': {'unread_count': {'$ifNull': [
+            {'$add': ['$unread_count', counts[user_id]]}, _count_unread(user_id)
+        ]}}}])
+        for user_id in missing
+    ]
+    if operations:
+        writer(users_col, 'notification').bulk_write(operations, ordered=False)
+    return set(missing)
+
+
+def deliver(docs):
+    """Insert notifications (defaults: unread, timestamped now) and bump their users' counters"""
+    if not docs:
+        return []
+    now = datetime.utcnow()
+    for doc in docs:
+        doc.setdefault('status', UNREAD)
+        doc.setdefault('timestamp', now)
+        doc.setdefault('created_at', now)
+    result = writer(notifications_col, 'notification').insert_many(docs, ordered=False)
+    counts = Counter(oid(doc['user_id']) for doc in docs if doc['status'] == UNREAD)
+    initialized = _initialize_unread(counts)
+    _adjust_unread({user_id: delta for user_id, delta in counts.items() if user_id not in initialized})
+    return result.inserted_ids
+
+
+def mark_read(uid, ids=None):
+    """Mark the user's notifications ``ids`` (all when None) read; returns how many changed"""
+    query = {'user_id': {'$in': _user_keys(uid)}, 'status': UNREAD}
+    if ids is not None:
+        query['_id'] = {'$in': [oid(value) for value in ids if oid(value)]}
+    result = writer(notifications_col, 'notification').update_many(
+        query, {'$set': {'status': READ, 'read_at': datetime.utcnow()}}
+    )
+    # Only documents this call flipped count, so concurrent calls never double-decrement
+    _adjust_unread({oid(uid): -result.modified_count})
+    return result.modified_count
@@ -0,0 +1,86 @@
+import os
+
+from pymongo import UpdateOne
+
+from utils.mongo_db import oid
+
+# Task participants.
+#
+# Mongo tasks name the people involved in several legacy fields (user_id,
+# created_by and assigned_to as ObjectIds or strings, their *_str mirrors and
+# the assignee's username). Every write also stores the resolved ObjectIds in
+# one ``participants`` array, so access checks become a single multikey
+# ``{participants: uid}`` lookup served by the participants_created_at index.
+#
+# The legacy fields stay on the documents. Until backfill_task_participants()
+# has run, task_access_query() also matches documents without participants
+# through the legacy clauses; set MONGO_TASK_ACCESS_LEGACY=false afterwards.
+#
+# participants governs who can see a task. Updates and deletes still match
+# the id fields only (task_write_query()), so the username-resolved assignee
+# does not gain write access.
+
+PARTICIPANT_FIELDS = (
+    'user_id', 'created_by', 'assigned_to',
+    'user_id_str', 'created_by_str', 'assigned_to_str',
+)
+
+LEGACY_TASK_ACCESS = os.getenv('MONGO_TASK_ACCESS_LEGACY', 'true').lower() == 'true'
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def task_participants(doc, user_ids_by_username=None):
+    """ObjectIds of everyone a task document names, in field order, without duplicates"""
+    participants = []
+    for field in PARTICIPANT_FIELDS:
+        value = oid(doc.get(field)) if doc.get(field) else None
+        if value and value not in participants:
+            participants.append(value)
+    username = doc.get('assignee')
+    if username and user_ids_by_username:
+        value = user_ids_by_username.get(username)
+        if value and value not in participants:
+            participants.append(value)
+    return participants
+
+
+def user_ids_by_username(users, usernames):
+    """{username: _id} for the given usernames, in one query"""
+    usernames = [name for name in set(usernames) if name]
+    if not usernames:
+        return {}
+    cursor = users.find({'username': {'$in': usernames}}, {'username': 1})
+    return {user['username']: user['_id'] for user in cursor}
+
+
+def backfill_task_participants(tasks, users, batch_size=BACKFILL_BATCH_SIZE, echo=None):
+    """Set ``participants`` on tasks that lack it, in _id order and small batches.
+
+    Runs online: each update only applies while the document still has no
+    participants, so it never overwrites a concurrent write, and an
+    interrupted run resumes where it stopped. Returns the number of updated
+    documents.
+    """
+    fields = dict.fromkeys(PARTICIPANT_FIELDS + ('assignee',), 1)
+    updated = 0
+    last_id = None
+    while True:
+        query = {'participants': {'$exists': False}}
+        if last_id is not None:
+            query['_id'] = {'$gt': last_id}
+        batch = list(tasks.find(query, fields).sort('_id', 1).limit(batch_size))
+        if not batch:
+            return updated
+        by_username = user_ids_by_username(users, (doc.get('assignee') for doc in batch))
+        result = tasks.bulk_write([
+            UpdateOne(
+                {'_id': doc['_id'], 'participants': {'$exists': False}},
+                {'$set': {'participants': task_participants(doc, by_username)}}
+            )
+            for doc in batch
+        ], ordered=False)
+        updated += result.modified_count
+        last_id = batch[-1]['_id']
+        if echo:
+            echo(f"Backfilled {updated} task(s) through {last_id}")
@@ -0,0 +1,139 @@
+from datetime import datetime
+
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+
+from models.project_model import Project
+from models.project_stats_model import ProjectStats
+from models.task_model import Task
+from models.work_log_model import WorkLog
+from utils.db import db
+
+# Incrementally maintained project rollups.
+#
+# Write paths describe a row's contribution to its project's rollup before
+# and after the change; record_change() applies the difference with
+# ``col = col + delta`` in the caller's transaction. rebuild_project_stats()
+# recomputes rows from the source tables to repair drift.
+
+STATUS_COLUMNS = {
+    'todo': 'todo_count',
+    'in_progress': 'in_progress_count',
+    'completed': 'completed_count',
+    'cancelled': 'cancelled_count'
+}
+
+ROLLUP_COLUMNS = ['task_count', *STATUS_COLUMNS.values(), 'total_hours', 'billable_cost']
+
+
+def task_contribution(status):
+    """Rollup counters contributed by one task with the given status"""
+    counts = {'task_count': 1}
+    if status in STATUS_COLUMNS:
+        counts[STATUS_COLUMNS[status]] = 1
+    return counts
+
+
+def work_log_contribution(hours_logged, is_billable, hourly_rate):
+    """Rollup totals contributed by one work log"""
+    # Request bodies may send numbers as strings; the columns accept both
+    hours = float(hours_logged or 0)
+    return {
+        'total_hours': hours,
+        'billable_cost': hours * float(hourly_rate or 0) if is_billable else 0
+    }
+
+
+def record_change(project_id, before=None, after=None):
+    """Apply ``after - before`` to a project's rollup row.
+
+    Flushes pending changes first. If the project has no rollup row yet it is
+    rebuilt from the source tables, which then already include the change.
+    When a concurrent transaction creates the row first, the rebuild's insert
+    fails and the delta is applied to that row instead.
+    """
+    db.session.flush()
+    before = before or {}
+    after = after or {}
+    deltas = {}
+    for column in set(before) | set(after):
+        delta = after.get(column, 0) - before.get(column, 0)
+        if delta:
+            deltas[column] = delta
+    if not deltas:
+        return
+
+    values = {column: getattr(ProjectStats, column) + delta for column, delta in deltas.items()}
+    values['updated_at'] = datetime.utcnow()
+    statement = update(ProjectStats).where(ProjectStats.project_id == project_id).values(**values)
+    if db.session.execute(statement).rowcount:
+        return
+    try:
+        # Savepoint, so losing the insert race leaves the caller's transaction usable
+        with db.session.begin_nested():
+            rebuild_project_stats(project_id)
+    except IntegrityError:
+        db.session.execute(statement)
+
+
+def _status_count(status):
+    return func.coalesce(func.sum(case((Task.status == status, 1), else_=0)), 0)
+
+
+def rebuild_project_stats(project_id=None):
+    """Recompute rollup rows from tasks and work logs (all projects by default).
+
+    Runs in the current transaction; the caller commits.
+    """
+    task_query = db.session.query(
+        Task.project_id,
+        func.count(Task.id),
+        *[_status_count(status) for status in STATUS_COLUMNS]
+    ).group_by(Task.project_id)
+
+    billable = WorkLog.is_billable.is_(True)
+    hours_query = db.session.query(
+        Task.project_id,
+        func.coalesce(func.sum(WorkLog.hours_logged), 0),
+        func.coalesce(func.sum(case(
+            (billable, WorkLog.hours_logged * func.coalesce(WorkLog.hourly_rate, 0)), else_=0
+        )), 0)
+    ).join(WorkLog, WorkLog.task_id == Task.id).group_by(Task.project_id)
+
+    project_query = db.session.query(Project.id)
+    if project_id is not None:
+        task_query = task_query.filter(Task.project_id == project_id)
+        hours_query = hours_query.filter(Task.project_id == project_id)
+        project_query = project_query.filter(Project.id == project_id)
+
+    rows = {pid: dict.fromkeys(ROLLUP_COLUMNS, 0) for (pid,) in project_query}
+    for pid, total, *status_counts in task_query:
+        if pid in rows:
+            rows[pid]['task_count'] = total
+            rows[pid].update(zip(STATUS_COLUMNS.values(), status_counts))
+    for pid, hours, cost in hours_query:
+        if pid in rows:
+            rows[pid]['total_hours'] = hours
+            rows[pid]['billable_cost'] = cost
+    rebuilt = len(rows)
+
+    existing = ProjectStats.query
+    if project_id is not None:
+        existing = existing.filter(ProjectStats.project_id == project_id)
+
+    now = datetime.utcnow()
+    for stats in existing:
+        values = rows.pop(stats.project_id, None)
+        if values is None:
+            # Project no longer exists
+            db.session.delete(stats)
+            continue
+        for column, value in values.items():
+            setattr(stats, column, value)
+        stats.updated_at = now
+
+    db.session.add_all(
+        ProjectStats(project_id=pid, updated_at=now, **values) for pid, values in rows.items()
+    )
+    db.session.flush()
+    return rebuilt
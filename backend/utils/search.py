@@ -0,0 +1,84 @@
+import re
+
+from sqlalchemy import and_, column, func, literal_column, or_, table, text
+
+from utils.db import db
+
+# Full-text search over tasks and projects.
+#
+# On SQLite each searchable table has an external-content FTS5 index
+# (``<table>_fts``) that shares rowids with the base table and is kept in
+# sync by triggers, so writes through the ORM, bulk inserts and raw SQL are
+# all indexed. Every search term is matched as a prefix and results are
+# ranked with bm25(), title/name hits weighing more than descriptions. Other
+# databases, or a SQLite file that has not been migrated yet, fall back to
+# case-insensitive LIKE filters ordered newest first.
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+MAX_SEARCH_TERMS = 8
+
+# FTS index name -> (content table, indexed columns, bm25 column weights)
+FTS_INDEXES = {
+    'tasks_fts': ('tasks', ('title', 'description'), (10.0, 1.0)),
+    'projects_fts': ('projects', ('name', 'description'), (10.0, 1.0)),
+}
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_statements(name):
+    """DDL creating the FTS5 index ``name``, its sync triggers, and filling it from the base table"""
+    source, columns, _ = FTS_INDEXES[name]
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{col}' for col in columns)
+    old = ', '.join(f'old.{col}' for col in columns)
+    insert = f'INSERT INTO {name}(rowid, {cols}) VALUES (new.id, {new});'
+    delete = f"INSERT INTO {name}({name}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5("
+        f"{cols}, content='{source}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f'CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {source} BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {source} BEGIN {delete} END',
+        # Status and date updates do not touch the index
+        f'CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF {cols} ON {source} '
+        f'BEGIN {delete} {insert} END',
+        f"INSERT INTO {name}({name}) VALUES ('rebuild')",
+    ]
+
+
+def search_terms(q):
+    """Split a query string into at most MAX_SEARCH_TERMS lowercase word terms"""
+    return [term.lower() for term in _TERM.findall(q or '')][:MAX_SEARCH_TERMS]
+
+
+def match_expression(terms):
+    """FTS5 MATCH string requiring every term, each as a prefix"""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def fts_available(name):
+    """True when the FTS index ``name`` exists in the current database"""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    found = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': name}
+    ).first()
+    return found is not None
+
+
+def search_query(query, model, name, terms):
+    """Restrict ``query`` over ``model`` to rows matching every term, best matches first"""
+    _, columns, weights = FTS_INDEXES[name]
+    if fts_available(name):
+        index = table(name, column('rowid'))
+        return query.join(index, index.c.rowid == model.id).filter(
+            literal_column(name).op('MATCH')(match_expression(terms))
+        ).order_by(func.bm25(literal_column(name), *weights), model.id.desc())
+
+    return query.filter(and_(*[
+        or_(*[getattr(model, col).ilike(f'%{term}%') for col in columns])
+        for term in terms
+    ])).order_by(model.created_at.desc(), model.id.desc())
@@ -0,0 +1,293 @@
+from collections import namedtuple
+from datetime import date, datetime, time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, load_only
+
+from models.project_model import Project
+from models.project_stats_model import ProjectStats
+from models.task_model import Task
+from models.user_model import User
+from models.work_log_model import WorkLog
+from utils.business_calendar import default_calendar
+from utils.helpers import get_list_arg
+
+# Batch serializers for list endpoints.
+#
+# Each helper eager-loads the relationships ``to_dict()`` touches and computes
+# per-row aggregates inside the same SELECT, so serializing a list costs a
+# fixed number of queries no matter how many rows it returns.
+
+
+def task_hours_column():
+    """SUM(work_logs.hours_logged) for the outer task row"""
+    return (
+        select(func.coalesce(func.sum(WorkLog.hours_logged), 0))
+        .where(WorkLog.task_id == Task.id)
+        .correlate(Task)
+        .scalar_subquery()
+        .label('total_hours_logged')
+    )
+
+
+def project_task_count_column():
+    """Task count for the outer project row, from project_stats when available"""
+    rolled_up = (
+        select(ProjectStats.task_count)
+        .where(ProjectStats.project_id == Project.id)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+    counted = (
+        select(func.count(Task.id))
+        .where(Task.project_id == Project.id)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+    return func.coalesce(rolled_up, counted).label('task_count')
+
+
+def task_load_options():
+    """Relationships read by Task.to_dict()"""
+    return (
+        joinedload(Task.project),
+        joinedload(Task.assignee),
+        joinedload(Task.creator),
+    )
+
+
+def work_log_load_options():
+    """Relationships read by WorkLog.to_dict()"""
+    return (
+        joinedload(WorkLog.task).joinedload(Task.project),
+        joinedload(WorkLog.user),
+    )
+
+
+def project_load_options():
+    """Relationships read by Project.to_dict()"""
+    return (joinedload(Project.owner),)
+
+
+# ---------- Sparse fieldsets ----------
+#
+# ``?fields=`` picks columns and ``?include=`` opts into values that need a
+# join or an aggregate. Only what was asked for is loaded: columns through
+# load_only(), related names through joinedload() of just the name columns,
+# aggregates as correlated subqueries.
+
+# ``key`` is the output field, ``columns`` the foreign keys the value needs,
+# ``options`` returns loader options and ``select`` an aggregate column.
+# ``batch`` computes the values for a whole list of rows in one call.
+Expansion = namedtuple('Expansion', ['key', 'value', 'columns', 'options', 'select', 'batch'], defaults=(None,))
+
+# Rows per batch() call when a sparse list is not streamed with yield_per
+SPARSE_BATCH_SIZE = 500
+
+FieldSet = namedtuple('FieldSet', ['columns', 'expansions'])
+
+
+def _full_name(user):
+    return f"{user.first_name} {user.last_name}" if user else None
+
+
+def _name_only(relationship):
+    return joinedload(relationship).load_only(User.first_name, User.last_name)
+
+
+def business_days_left(tasks, today=None, calendar=None):
+    """Business days from today until each open task's due date, in one vectorized count.
+
+    Negative when overdue; None for completed tasks and tasks without a due date.
+    """
+    calendar = calendar or default_calendar()
+    today = today or date.today()
+    counts = calendar.count_many([today] * len(tasks), [task.due_date for task in tasks])
+    return [
+        int(count) if task.due_date and task.status != 'completed' else None
+        for task, count in zip(tasks, counts)
+    ]
+
+
+TASK_EXPANSIONS = {
+    'project': Expansion(
+        'project_name', lambda task: task.project.name if task.project else None, ('project_id',),
+        lambda: (joinedload(Task.project).load_only(Project.name),), None
+    ),
+    'assignee': Expansion(
+        'assignee_name', lambda task: _full_name(task.assignee), ('assigned_to',),
+        lambda: (_name_only(Task.assignee),), None
+    ),
+    'creator': Expansion(
+        'creator_name', lambda task: _full_name(task.creator), ('created_by',),
+        lambda: (_name_only(Task.creator),), None
+    ),
+    'hours': Expansion('total_hours_logged', None, (), tuple, task_hours_column),
+    'schedule': Expansion('business_days_left', None, ('due_date', 'status'), tuple, None, business_days_left),
+}
+
+WORK_LOG_EXPANSIONS = {
+    'task': Expansion(
+        'task_title', lambda log: log.task.title if log.task else None, ('task_id',),
+        lambda: (joinedload(WorkLog.task).load_only(Task.title, Task.project_id),), None
+    ),
+    'project': Expansion(
+        'project_name', lambda log: log.task.project.name if log.task and log.task.project else None, ('task_id',),
+        lambda: (
+            joinedload(WorkLog.task).load_only(Task.title, Task.project_id)
+            .joinedload(Task.project).load_only(Project.name),
+        ), None
+    ),
+    'user': Expansion(
+        'user_name', lambda log: _full_name(log.user), ('user_id',),
+        lambda: (_name_only(WorkLog.user),), None
+    ),
+    'cost': Expansion(
+        'total_cost', lambda log: log.hours_logged * log.hourly_rate if log.hourly_rate else 0,
+        ('hours_logged', 'hourly_rate'), tuple, None
+    ),
+}
+
+PROJECT_EXPANSIONS = {
+    'owner': Expansion(
+        'owner_name', lambda project: _full_name(project.owner), ('owner_id',),
+        lambda: (_name_only(Project.owner),), None
+    ),
+    'task_count': Expansion('task_count', None, (), tuple, project_task_count_column),
+}
+
+
+def parse_fieldset(args, model, expansions, always=('id',)):
+    """Read ``fields`` and ``include`` request args into a FieldSet.
+
+    Returns None when neither was sent, which keeps the full payload.
+    ``fields`` may also name an expansion's output key (e.g. project_name).
+    Raises ValueError for unknown names.
+    """
+    fields = get_list_arg(args, 'fields')
+    include = get_list_arg(args, 'include')
+    if fields is None and include is None:
+        return None
+
+    column_names = model.__table__.columns.keys()
+    by_key = {expansion.key: name for name, expansion in expansions.items()}
+    columns = list(always)
+    chosen = []
+    for name in fields if fields else column_names:
+        if name in column_names:
+            if name not in columns:
+                columns.append(name)
+        elif name in by_key:
+            if by_key[name] not in chosen:
+                chosen.append(by_key[name])
+        else:
+            raise ValueError(f"Unknown field '{name}'")
+    for name in include or []:
+        if name not in expansions:
+            raise ValueError(f"Unknown include '{name}'. Use: {', '.join(expansions)}")
+        if name not in chosen:
+            chosen.append(name)
+    return FieldSet(columns, [expansions[name] for name in chosen])
+
+
+def _json_value(value):
+    if isinstance(value, time):
+        return value.strftime('%H:%M:%S')
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def iter_sparse(query, model, fieldset, batch_size=None):
+    """Yield dicts holding only the columns and expansions of ``fieldset``"""
+    loaded = list(fieldset.columns)
+    for expansion in fieldset.expansions:
+        loaded.extend(column for column in expansion.columns if column not in loaded)
+    options = [load_only(*(getattr(model, name) for name in loaded))]
+    for expansion in fieldset.expansions:
+        options.extend(expansion.options())
+    aggregates = [expansion for expansion in fieldset.expansions if expansion.select]
+    batched = [expansion for expansion in fieldset.expansions if expansion.batch]
+    related = [expansion for expansion in fieldset.expansions if expansion.value]
+
+    query = query.options(*options)
+    if aggregates:
+        query = query.add_columns(*(expansion.select() for expansion in aggregates))
+    if batch_size:
+        query = query.yield_per(batch_size)
+    rows = (((row[0], row[1:]) if aggregates else (row, ())) for row in query)
+    for chunk in _chunks(rows, batch_size or SPARSE_BATCH_SIZE):
+        objs = [obj for obj, _ in chunk]
+        batch_values = [expansion.batch(objs) for expansion in batched]
+        for index, (obj, values) in enumerate(chunk):
+            item = {name: _json_value(getattr(obj, name)) for name in fieldset.columns}
+            for expansion in related:
+                item[expansion.key] = expansion.value(obj)
+            for expansion, value in zip(aggregates, values):
+                item[expansion.key] = value
+            for expansion, computed in zip(batched, batch_values):
+                item[expansion.key] = computed[index]
+            yield item
+
+
+def _chunks(iterable, size):
+    """Lists of up to ``size`` consecutive items"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_tasks(query, batch_size=None, fieldset=None):
+    """Yield serialized tasks; ``batch_size`` streams rows with yield_per"""
+    if fieldset:
+        yield from iter_sparse(query, Task, fieldset, batch_size)
+        return
+    query = query.options(*task_load_options()).add_columns(task_hours_column())
+    if batch_size:
+        query = query.yield_per(batch_size)
+    for task, hours in query:
+        yield task.to_dict(total_hours=hours)
+
+
+def iter_work_logs(query, batch_size=None, fieldset=None):
+    """Yield serialized work logs; ``batch_size`` streams rows with yield_per"""
+    if fieldset:
+        yield from iter_sparse(query, WorkLog, fieldset, batch_size)
+        return
+    query = query.options(*work_log_load_options())
+    if batch_size:
+        query = query.yield_per(batch_size)
+    for log in query:
+        yield log.to_dict()
+
+
+def iter_projects(query, batch_size=None, fieldset=None):
+    """Yield serialized projects; ``batch_size`` streams rows with yield_per"""
+    if fieldset:
+        yield from iter_sparse(query, Project, fieldset, batch_size)
+        return
+    query = query.options(*project_load_options()).add_columns(project_task_count_column())
+    if batch_size:
+        query = query.yield_per(batch_size)
+    for project, count in query:
+        yield project.to_dict(task_count=count)
+
+
+def serialize_tasks(query, fieldset=None):
+    """Run a Task query and serialize the rows with eager-loaded relations"""
+    return list(iter_tasks(query, fieldset=fieldset))
+
+
+def serialize_work_logs(query, fieldset=None):
+    """Run a WorkLog query and serialize the rows with eager-loaded relations"""
+    return list(iter_work_logs(query, fieldset=fieldset))
+
+
+def serialize_projects(query, fieldset=None):
+    """Run a Project query and serialize the rows with eager-loaded relations"""
+    return list(iter_projects(query, fieldset=fieldset))
@@ -0,0 +1,76 @@
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from models.data_version_model import DataVersion
+from utils.db import db
+
+# Shared data versions.
+#
+# Every tracked table has a row in data_versions whose counter is bumped in
+# the same transaction as any write to that table. ETags and cached
+# dashboards embed the counters, so a commit made by one worker is visible
+# to every worker on its next request, for one primary-key read.
+#
+# Writes are picked up from flushes and ORM-enabled insert/update/delete
+# statements; bulk_*_mappings() bypass both, so callers using them report
+# the table with touch_tables().
+
+TRACKED_TABLES = ('users', 'projects', 'tasks', 'work_logs', 'project_stats')
+
+
+def _table_name(table):
+    return table if isinstance(table, str) else table.__tablename__
+
+
+def touch_tables(session, *tables):
+    """Mark tables (names or models) as written in ``session``'s transaction"""
+    touched = session.info.setdefault('touched_tables', set())
+    touched.update(name for name in map(_table_name, tables) if name in TRACKED_TABLES)
+
+
+def data_versions(*tables):
+    """Current counters for the given tables (names or models), in order"""
+    names = [_table_name(table) for table in tables]
+    rows = db.session.execute(
+        select(DataVersion.table_name, DataVersion.version).where(DataVersion.table_name.in_(names))
+    )
+    versions = dict(rows.all())
+    return [versions.get(name, 0) for name in names]
+
+
+def seed_data_versions():
+    """Create the counter rows that do not exist yet"""
+    existing = set(db.session.scalars(select(DataVersion.table_name)))
+    db.session.add_all(DataVersion(table_name=name, version=0) for name in TRACKED_TABLES if name not in existing)
+
+
+@event.listens_for(Session, 'before_flush')
+def _record_flush(session, flush_context, instances):
+    changed = list(session.new) + list(session.deleted)
+    changed += [obj for obj in session.dirty if session.is_modified(obj)]
+    touch_tables(session, *(obj.__tablename__ for obj in changed if hasattr(obj, '__tablename__')))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _record_statement(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        touch_tables(state.session, *(mapper.local_table.name for mapper in state.all_mappers))
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_versions(session):
+    # Flush first so pending objects are counted before the counters move
+    session.flush()
+    tables = session.info.pop('touched_tables', None)
+    if tables:
+        session.execute(
+            update(DataVersion)
+            .where(DataVersion.table_name.in_(sorted(tables)))
+            .values(version=DataVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_writes(session):
+    session.info.pop('touched_tables', None)
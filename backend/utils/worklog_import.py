@@ -0,0 +1,168 @@
+import csv
+from datetime import date, datetime
+
+from sqlalchemy import insert
+
+from models.task_model import Task
+from models.work_log_model import WorkLog, hours_between
+from utils.db import db
+from utils.rollups import record_change, work_log_contribution
+
+# Streaming CSV import of work logs.
+#
+# Rows are read one at a time from a text stream and buffered into chunks.
+# Each chunk resolves its task ids with one IN query, is inserted with a
+# single executemany INSERT and committed, so memory stays flat no matter
+# how large the file is.
+#
+# Columns: task_id, hours_logged, work_date, start_time, end_time,
+# description, is_billable, hourly_rate and, for admins/managers, user_id.
+# hours_logged may be left empty when start_time and end_time are given.
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'no', 'n'}
+
+
+def _parse_time(value):
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            pass
+    raise ValueError(f"time data '{value}' does not match format '%H:%M:%S'")
+
+
+def _parse_bool(value):
+    value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"invalid boolean '{value}'")
+
+
+def parse_row(row, default_user_id):
+    """Convert one CSV row into WorkLog column values; raises ValueError"""
+    row = {key.strip(): (value or '').strip() for key, value in row.items() if key}
+
+    if not row.get('task_id'):
+        raise ValueError('task_id is required')
+    values = {
+        'task_id': int(row['task_id']),
+        'user_id': int(row['user_id']) if row.get('user_id') else default_user_id,
+        'work_date': datetime.strptime(row['work_date'], '%Y-%m-%d').date() if row.get('work_date') else date.today(),
+        'start_time': _parse_time(row['start_time']) if row.get('start_time') else None,
+        'end_time': _parse_time(row['end_time']) if row.get('end_time') else None,
+        'description': row.get('description', ''),
+        'is_billable': _parse_bool(row['is_billable']) if row.get('is_billable') else True,
+        'hourly_rate': float(row['hourly_rate']) if row.get('hourly_rate') else 0.0
+    }
+
+    if row.get('hours_logged'):
+        values['hours_logged'] = float(row['hours_logged'])
+    else:
+        values['hours_logged'] = hours_between(values['work_date'], values['start_time'], values['end_time'])
+    if not values['hours_logged'] or values['hours_logged'] <= 0:
+        raise ValueError('hours_logged is required (or start_time and end_time)')
+    return values
+
+
+class WorkLogImport:
+    """Accumulates import progress and row-level errors"""
+
+    def __init__(self, user, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.errors_truncated = False
+
+    def error(self, line, message, count=1):
+        self.failed += count
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+        else:
+            self.errors_truncated = True
+
+    def run(self, text_stream):
+        """Import every row of a CSV text stream"""
+        reader = csv.DictReader(text_stream)
+        if not reader.fieldnames or 'task_id' not in [name.strip() for name in reader.fieldnames]:
+            raise ValueError('CSV header must include task_id')
+
+        chunk = []
+        for row in reader:
+            # Physical line in the file; the header is line 1
+            line = reader.line_num
+            try:
+                chunk.append((line, parse_row(row, self.user.id)))
+            except (ValueError, TypeError) as e:
+                self.error(line, str(e))
+                continue
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk)
+                chunk = []
+        if chunk:
+            self._flush(chunk)
+        return self
+
+    def _flush(self, chunk):
+        """Check permissions for a chunk in one query and insert the valid rows"""
+        task_ids = {values['task_id'] for _, values in chunk}
+        tasks = {
+            task_id: (project_id, assigned_to, created_by)
+            for task_id, project_id, assigned_to, created_by in db.session.query(
+                Task.id, Task.project_id, Task.assigned_to, Task.created_by
+            ).filter(Task.id.in_(task_ids))
+        }
+
+        is_manager = self.user.role in ['admin', 'manager']
+        now = datetime.utcnow()
+        rows = []
+        deltas = {}
+        for line, values in chunk:
+            task = tasks.get(values['task_id'])
+            if not task:
+                self.error(line, 'Task not found')
+                continue
+            project_id, assigned_to, created_by = task
+            if values['user_id'] != self.user.id and not is_manager:
+                self.error(line, 'Access denied')
+                continue
+            # Same rule as POST /work-logs, applied to the user the time is logged for
+            if values['user_id'] not in (assigned_to, created_by):
+                self.error(line, 'Access denied')
+                continue
+
+            values['created_at'] = now
+            values['updated_at'] = now
+            rows.append(values)
+            contribution = work_log_contribution(values['hours_logged'], values['is_billable'], values['hourly_rate'])
+            project_deltas = deltas.setdefault(project_id, {})
+            for column, delta in contribution.items():
+                project_deltas[column] = project_deltas.get(column, 0) + delta
+
+        if not rows:
+            return
+        try:
+            db.session.execute(insert(WorkLog), rows)
+            for project_id, project_deltas in deltas.items():
+                record_change(project_id, after=project_deltas)
+            db.session.commit()
+            self.imported += len(rows)
+        except Exception as e:
+            db.session.rollback()
+            first_line = chunk[0][0]
+            self.error(first_line, f'Chunk starting at line {first_line} failed: {e}', count=len(rows))
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda error: error['line']),
+            'errors_truncated': self.errors_truncated
+        }